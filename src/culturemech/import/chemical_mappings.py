@@ -26,7 +26,7 @@ Integration:
 import csv
 import json
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Dict, Iterable, Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -233,6 +233,22 @@ class ChemicalMapper:
         normalized = ingredient_name.lower().strip()
         return self.mappings.get(normalized)
 
+    def lookup_many(self, ingredient_names: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Look up chemical mappings for many ingredients at once.
+
+        Args:
+            ingredient_names: Ingredient names (case-insensitive)
+
+        Returns:
+            Dict mapping each distinct input name to its mapping dict or None
+        """
+        mappings = self.mappings
+        return {
+            name: mappings.get(name.lower().strip())
+            for name in set(ingredient_names)
+        }
+
     def get_chebi_term(self, ingredient_name: str) -> Optional[Dict]:
         """
         Get CHEBI term for ingredient suitable for CultureMech schema.
@@ -4,13 +4,30 @@ Enriches existing media recipes with role annotations.
 """
 
 import csv
+import os
+import re
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
 import yaml
 import sys
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+from culturemech.utils.parallel import map_in_order
+
 PFAS_REPO = Path("/Users/marcin/Documents/VIMSS/ontology/PFAS/PFASCommunityAgents")
 INGREDIENT_FILE = PFAS_REPO / "data/sheets_pfas/PFAS_Data_for_AI_media_ingredients_extended.tsv"
 
+# Recipes per process-pool task in enrich_all_recipes
+_BATCH_SIZE = 64
+
 # Map PFAS roles to CultureMech IngredientRoleEnum values
 ROLE_MAPPING = {
     "carbon source": "CARBON_SOURCE",
@@ -32,31 +49,59 @@ def load_ingredient_roles():
         print(f"Warning: PFAS data file not found at {INGREDIENT_FILE}")
         return {}
 
-    roles_db = {}
+    # Dict keys act as an insertion-ordered set of roles per ID
+    roles_by_id = defaultdict(dict)
 
     with open(INGREDIENT_FILE) as f:
-        reader = csv.DictReader(f, delimiter='\t')
+        reader = csv.reader(f, delimiter='\t')
+        header = next(reader, [])
+        if 'ontology_id' not in header or 'role' not in header:
+            print(f"Warning: {INGREDIENT_FILE} lacks 'ontology_id'/'role' columns")
+            return {}
+        oid_i = header.index('ontology_id')
+        role_i = header.index('role')
+        min_len = max(oid_i, role_i) + 1
+
         for row in reader:
-            chebi_id = row.get('ontology_id', '').strip()
-            role_raw = row.get('role', '').strip()
+            if len(row) < min_len:
+                continue
+            chebi_id = row[oid_i].strip()
+            role_raw = row[role_i].strip()
             role_enum = ROLE_MAPPING.get(role_raw)
 
             if chebi_id and role_enum:
-                if chebi_id not in roles_db:
-                    roles_db[chebi_id] = []
-                if role_enum not in roles_db[chebi_id]:
-                    roles_db[chebi_id].append(role_enum)
+                roles_by_id[chebi_id][role_enum] = None
+
+    roles_db = {chebi_id: list(roles) for chebi_id, roles in roles_by_id.items()}
 
     print(f"Loaded {len(roles_db)} ingredient role mappings")
     return roles_db
 
 
-def enrich_recipe_with_roles(recipe_path: Path, roles_db: dict, dry_run: bool = False):
-    """Add role annotations to ingredients in a recipe."""
-    with open(recipe_path) as f:
-        recipe = yaml.safe_load(f)
+def build_needle_re(roles_db: dict) -> Optional[re.Pattern]:
+    """Compile a bytes pattern matching any ontology ID in roles_db."""
+    if not roles_db:
+        return None
+    return re.compile(b'|'.join(re.escape(key.encode('utf-8')) for key in roles_db))
+
+
+def _apply_roles(
+    data: bytes,
+    roles_db: dict,
+    needle_re: Optional[re.Pattern] = None,
+) -> Optional[Tuple[bytes, List[str]]]:
+    """Add role annotations to the recipe in ``data``.
+
+    Returns the updated file contents as UTF-8 bytes with a description of
+    each change, or None if nothing changed. If ``needle_re`` (see
+    build_needle_re) is given, recipes whose raw bytes contain none of the
+    roles_db IDs are skipped without parsing.
+    """
+    if needle_re is not None and not needle_re.search(data):
+        return None
+
+    recipe = yaml.load(data, Loader=SafeLoader)
 
-    modified = False
     changes = []
 
     for ingredient in recipe.get('ingredients', []):
@@ -65,35 +110,176 @@ def enrich_recipe_with_roles(recipe_path: Path, roles_db: dict, dry_run: bool =
 
         if chebi_id in roles_db and 'role' not in ingredient:
             ingredient['role'] = roles_db[chebi_id]
-            modified = True
             changes.append(f"  Added roles {roles_db[chebi_id]} to {ingredient.get('preferred_term', 'unknown')}")
 
-    if modified:
-        if not dry_run:
-            with open(recipe_path, 'w') as f:
-                yaml.dump(recipe, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-            print(f"✓ Updated {recipe_path.name}")
-        else:
-            print(f"Would update {recipe_path.name}:")
+    if not changes:
+        return None
 
-        for change in changes:
-            print(change)
+    # Role enums are ASCII, so an ASCII source file needs no unicode output;
+    # allow_unicode=False then lets the emitter take its ASCII fast path
+    updated = yaml.dump(recipe, Dumper=SafeDumper, encoding='utf-8',
+                        default_flow_style=False, allow_unicode=not data.isascii(),
+                        sort_keys=False)
+    return updated, changes
 
-    return modified
 
+def _report_changes(recipe_path: Union[str, Path], changes: List[str], dry_run: bool):
+    """Print the role annotations added to a recipe."""
+    if not dry_run:
+        print(f"✓ Updated {os.path.basename(recipe_path)}")
+    else:
+        print(f"Would update {os.path.basename(recipe_path)}:")
 
-def enrich_all_recipes(kb_dir: Path, roles_db: dict, dry_run: bool = False):
-    """Enrich all recipes in the knowledge base."""
-    recipe_files = list(kb_dir.glob("**/*.yaml"))
-    print(f"Found {len(recipe_files)} recipe files")
+    for change in changes:
+        print(change)
 
-    updated_count = 0
-    for recipe_path in recipe_files:
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file as bytes."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _atomic_write(path: str, data: bytes):
+    """Write bytes to path via a temporary file and rename."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
         try:
-            if enrich_recipe_with_roles(recipe_path, roles_db, dry_run=dry_run):
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def enrich_recipe_with_roles(
+    recipe_path: Union[str, Path],
+    roles_db: dict,
+    dry_run: bool = False,
+    needle_re: Optional[re.Pattern] = None,
+):
+    """Add role annotations to ingredients in a recipe.
+
+    The file is parsed from raw bytes with the libyaml loader if present and
+    replaced atomically when updated.
+    """
+    result = _apply_roles(_read_bytes(recipe_path), roles_db, needle_re)
+    if result is None:
+        return False
+
+    updated, changes = result
+    if not dry_run:
+        _atomic_write(recipe_path, updated)
+    _report_changes(recipe_path, changes, dry_run)
+    return True
+
+
+def _enrich_files(
+    recipe_files: List[str],
+    roles_db: dict,
+    dry_run: bool = False,
+    needle_re: Optional[re.Pattern] = None,
+    io_threads: int = 4,
+    prefetch: int = 8,
+) -> int:
+    """Enrich a sequence of recipes, overlapping file I/O with parsing.
+
+    A small thread pool reads the next ``prefetch`` files ahead of the one
+    being parsed and writes updated files in the background, so disk latency
+    is hidden behind YAML parsing on the calling thread.
+
+    Returns:
+        Number of recipes updated (or that would be, in dry-run mode)
+    """
+    updated_count = 0
+    writes = []
+    paths = iter(recipe_files)
+
+    with ThreadPoolExecutor(max_workers=io_threads) as io_pool:
+        pending = deque(
+            (path, io_pool.submit(_read_bytes, path)) for path in islice(paths, prefetch)
+        )
+        while pending:
+            recipe_path, read_future = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, io_pool.submit(_read_bytes, next_path)))
+
+            try:
+                result = _apply_roles(read_future.result(), roles_db, needle_re)
+            except Exception as e:
+                print(f"Error processing {recipe_path}: {e}")
+                continue
+
+            if result is None:
+                continue
+            updated, changes = result
+            if dry_run:
+                _report_changes(recipe_path, changes, dry_run)
                 updated_count += 1
-        except Exception as e:
-            print(f"Error processing {recipe_path}: {e}")
+            else:
+                writes.append(
+                    (recipe_path, changes, io_pool.submit(_atomic_write, recipe_path, updated))
+                )
+
+        # Report each update only once its file has been written
+        for recipe_path, changes, write_future in writes:
+            try:
+                write_future.result()
+            except Exception as e:
+                print(f"Error processing {recipe_path}: {e}")
+                continue
+            _report_changes(recipe_path, changes, dry_run)
+            updated_count += 1
+
+    return updated_count
+
+
+def _iter_yaml_files(root: Union[str, Path]) -> Iterator[str]:
+    """Yield paths of all .yaml files under root using os.scandir.
+
+    Avoids creating a Path object per directory entry; DirEntry caches the
+    file type from the directory listing, so no extra stat per entry.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.yaml'):
+                    yield entry.path
+
+
+def enrich_all_recipes(kb_dir: Path, roles_db: dict, dry_run: bool = False, workers: Optional[int] = None):
+    """Enrich all recipes in the knowledge base.
+
+    Recipes are independent, so batches of them are processed in parallel
+    across ``workers`` processes (default: one per CPU), each of which
+    overlaps its file reads/writes with parsing. Use ``workers=1`` to run
+    in the current process.
+    """
+    recipe_files = list(_iter_yaml_files(kb_dir))
+    print(f"Found {len(recipe_files)} recipe files")
+
+    batches = [
+        recipe_files[i:i + _BATCH_SIZE] for i in range(0, len(recipe_files), _BATCH_SIZE)
+    ]
+    # roles_db is sent to each worker once with the callable, not per batch
+    enrich_batch = partial(
+        _enrich_files, roles_db=roles_db, dry_run=dry_run, needle_re=build_needle_re(roles_db)
+    )
+
+    updated_count = 0
+    for batch, (count, error) in zip(batches, map_in_order(enrich_batch, batches, workers=workers)):
+        if error is not None:
+            print(f"Error processing batch starting at {batch[0]}: {error}")
+            continue
+        updated_count += count
 
     print(f"\n✓ {'Would update' if dry_run else 'Updated'} {updated_count} recipes with ingredient roles")
 
@@ -107,6 +293,8 @@ def main():
                         help="Knowledge base directory (default: kb/media)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Show what would be changed without modifying files")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
 
     args = parser.parse_args()
 
@@ -119,7 +307,7 @@ def main():
         print("No ingredient roles loaded. Exiting.")
         sys.exit(1)
 
-    enrich_all_recipes(args.kb_dir, roles_db, dry_run=args.dry_run)
+    enrich_all_recipes(args.kb_dir, roles_db, dry_run=args.dry_run, workers=args.workers)
 
 
 if __name__ == "__main__":
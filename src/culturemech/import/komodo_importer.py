@@ -20,20 +20,61 @@ Reference:
 """
 
 import json
+import os
 import yaml
 import re
+from collections import defaultdict
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 import logging
 from importlib import import_module
 
+from culturemech.utils.filename_utils import sanitize_filename_part
+from culturemech.utils.json_utils import load_json_file
+from culturemech.utils.parallel import map_in_order
+from culturemech.utils.yaml_utils import dump_recipe_yaml
+
 # Import from module with reserved keyword name
 ChemicalMapper = import_module('culturemech.import.chemical_mappings').ChemicalMapper
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keyword patterns for medium type/category inference (matched against
+# lowercased names)
+_COMPLEX_RE = re.compile(r'agar|broth|extract|peptone|yeast')
+_MINIMAL_RE = re.compile(r'minimal|defined|synthetic')
+_FUNGAL_RE = re.compile(r'fungi|fungal|yeast|mold|mould')
+_ARCHAEA_RE = re.compile(r'archaea|archaeal|halophil|methanogen')
+_SPECIALIZED_RE = re.compile(r'marine|seawater|extreme|anaerobic')
+
+# Recipe text shared by every KOMODO medium
+_KOMODO_NOTES = (
+    "Source: KOMODO (Known Media Database) "
+    "Reference: https://komodo.modelseed.org/ "
+    "Standardized molar concentrations from SEED compound database"
+)
+
+_PREPARATION_STEPS = [
+    {
+        'step_number': 1,
+        'action': 'DISSOLVE',
+        'description': 'Dissolve all ingredients in distilled water to achieve specified molar concentrations'
+    },
+    {
+        'step_number': 2,
+        'action': 'ADJUST_PH',
+        'description': 'Adjust pH if specified in original formulation'
+    },
+    {
+        'step_number': 3,
+        'action': 'AUTOCLAVE',
+        'description': 'Sterilize by autoclaving at 121°C for 15-20 minutes'
+    }
+]
+
 
 class KOMODOImporter:
     """Import KOMODO media data into CultureMech format."""
@@ -76,10 +117,27 @@ class KOMODOImporter:
         # Initialize chemical mapper
         self.chemical_mapper = chemical_mapper
 
+        # Curation timestamp shared by all media in one import_all run
+        self._import_timestamp: Optional[str] = None
+
         logger.info(f"Loaded {len(self.media)} KOMODO media recipes")
         logger.info(f"Loaded {len(self.compounds)} SEED compounds")
         logger.info(f"Loaded {len(self.organisms)} organism associations")
 
+    @cached_property
+    def _inferences(self) -> List[tuple]:
+        """(name_lower, medium_type, category) for each medium, computed once
+        and shared by import_all and get_statistics."""
+        inferences = []
+        for medium in self.media:
+            name_lower = (medium.get('name') or '').lower()
+            inferences.append((
+                name_lower,
+                self._infer_medium_type(medium, name_lower),
+                self._infer_category(medium, name_lower),
+            ))
+        return inferences
+
     def _load_json(self, filename: str) -> Dict:
         """Load JSON file from KOMODO data directory."""
         path = self.komodo_dir / filename
@@ -87,58 +145,86 @@ class KOMODOImporter:
             logger.warning(f"File not found: {path}")
             return {'count': 0, 'data': []}
 
-        with open(path, encoding='utf-8') as f:
-            return json.load(f)
+        return load_json_file(path)
 
-    def import_all(self, limit: Optional[int] = None) -> List[Path]:
+    def import_all(
+        self,
+        limit: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> List[Path]:
         """
         Import all KOMODO media to CultureMech format.
 
+        Duplicate checks run in this process; conversion and writing of the
+        remaining media is spread across a process pool.
+
         Args:
             limit: Optional limit on number of media to import
+            workers: Number of worker processes (default: CPU count; 1 = serial)
 
         Returns:
             List of generated YAML file paths
         """
         generated = []
         media_list = self.media[:limit] if limit else self.media
+        self._import_timestamp = datetime.utcnow().isoformat() + 'Z'
 
         logger.info(f"\nImporting {len(media_list)} KOMODO media recipes...")
 
         duplicates = 0
+        to_import = []
 
-        for medium in media_list:
+        for medium, (name_lower, medium_type, category) in zip(media_list, self._inferences):
             try:
                 # Check for duplicates
-                if self._check_duplicate(medium):
+                if self._check_duplicate(medium, name_lower):
                     logger.debug(f"⊘ Skipped duplicate: {medium.get('name', 'Unknown')}")
                     duplicates += 1
                     continue
-
-                yaml_path = self.import_medium(medium)
-                if yaml_path:
-                    generated.append(yaml_path)
-                    logger.info(f"✓ Imported {yaml_path.name}")
             except Exception as e:
                 logger.error(
                     f"✗ Error importing {medium.get('name', 'Unknown')}: {e}"
                 )
+                continue
+            to_import.append((medium, medium_type, category, name_lower))
+
+        results = list(map_in_order(
+            self.import_medium, to_import, workers=workers, chunksize=32, unpack=True
+        ))
+
+        for (medium, *_), (yaml_path, error) in zip(to_import, results):
+            if error:
+                logger.error(
+                    f"✗ Error importing {medium.get('name', 'Unknown')}: {error}"
+                )
+            elif yaml_path:
+                generated.append(yaml_path)
+                logger.info(f"✓ Imported {yaml_path.name}")
 
         logger.info(f"\n✓ Imported {len(generated)}/{len(media_list)} media")
         logger.info(f"⊘ Skipped {duplicates} duplicates")
         return generated
 
-    def import_medium(self, medium: Dict) -> Optional[Path]:
+    def import_medium(
+        self,
+        medium: Dict,
+        medium_type: Optional[str] = None,
+        category: Optional[str] = None,
+        name_lower: Optional[str] = None,
+    ) -> Optional[Path]:
         """
         Convert a single KOMODO medium to CultureMech YAML.
 
         Args:
             medium: KOMODO media dictionary
+            medium_type: Precomputed medium type (inferred if not given)
+            category: Precomputed category (inferred if not given)
+            name_lower: Precomputed lowercased medium name (optional)
 
         Returns:
             Path to generated YAML file
         """
-        recipe = self._convert_to_culturemech(medium)
+        recipe = self._convert_to_culturemech(medium, medium_type, name_lower)
 
         if not recipe:
             return None
@@ -154,22 +240,30 @@ class KOMODOImporter:
         filename = f"KOMODO_{medium_id}_{clean_name}.yaml"
 
         # Determine category
-        category = self._infer_category(medium)
+        if category is None:
+            category = self._infer_category(medium, name_lower)
         output_path = self.output_dir / category / filename
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write YAML
+        # Write YAML (fast fixed-schema emitter, PyYAML fallback)
         with open(output_path, 'w', encoding='utf-8') as f:
-            yaml.dump(recipe, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+            f.write(dump_recipe_yaml(recipe))
 
         return output_path
 
-    def _convert_to_culturemech(self, medium: Dict) -> Optional[Dict]:
+    def _convert_to_culturemech(
+        self,
+        medium: Dict,
+        medium_type: Optional[str] = None,
+        name_lower: Optional[str] = None,
+    ) -> Optional[Dict]:
         """
         Convert KOMODO medium to CultureMech schema.
 
         Args:
             medium: KOMODO media dictionary
+            medium_type: Precomputed medium type (inferred if not given)
+            name_lower: Precomputed lowercased medium name (optional)
 
         Returns:
             CultureMech recipe dictionary
@@ -177,12 +271,17 @@ class KOMODOImporter:
         if not medium.get('name'):
             return None
 
+        if name_lower is None:
+            name_lower = medium['name'].lower()
+        if medium_type is None:
+            medium_type = self._infer_medium_type(medium, name_lower)
+
         recipe = {
             'name': medium['name'],
             'original_name': medium['name'],
             'category': 'imported',
-            'medium_type': self._infer_medium_type(medium),
-            'physical_state': self._infer_physical_state(medium),
+            'medium_type': medium_type,
+            'physical_state': self._infer_physical_state(medium, name_lower),
             'ingredients': self._map_ingredients(medium),
             'preparation_steps': self._create_preparation_steps(medium),
             'curation_history': self._create_curation_history(medium)
@@ -199,12 +298,7 @@ class KOMODOImporter:
             }
 
         # Add notes
-        notes = []
-        notes.append(f"Source: KOMODO (Known Media Database)")
-        notes.append(f"Reference: https://komodo.modelseed.org/")
-        notes.append(f"Standardized molar concentrations from SEED compound database")
-
-        recipe['notes'] = ' '.join(notes)
+        recipe['notes'] = _KOMODO_NOTES
 
         return recipe
 
@@ -288,69 +382,54 @@ class KOMODOImporter:
         """
         Create preparation steps from KOMODO data.
 
+        The same (read-only) list is returned for every medium.
+
         Args:
             medium: KOMODO media dictionary
 
         Returns:
             List of preparation step dictionaries
         """
-        steps = [
-            {
-                'step_number': 1,
-                'action': 'DISSOLVE',
-                'description': 'Dissolve all ingredients in distilled water to achieve specified molar concentrations'
-            },
-            {
-                'step_number': 2,
-                'action': 'ADJUST_PH',
-                'description': 'Adjust pH if specified in original formulation'
-            },
-            {
-                'step_number': 3,
-                'action': 'AUTOCLAVE',
-                'description': 'Sterilize by autoclaving at 121°C for 15-20 minutes'
-            }
-        ]
-
-        return steps
+        # Identical for every medium; the shared list is never mutated
+        return _PREPARATION_STEPS
 
-    def _infer_medium_type(self, medium: Dict) -> str:
+    def _infer_medium_type(self, medium: Dict, name_lower: Optional[str] = None) -> str:
         """
         Infer medium type from name and composition.
 
         Args:
             medium: KOMODO media dictionary
+            name_lower: Precomputed lowercased medium name (optional)
 
         Returns:
             Medium type (DEFINED, COMPLEX, MINIMAL)
         """
-        name = medium.get('name', '').lower()
+        name = name_lower if name_lower is not None else medium.get('name', '').lower()
 
         # Check for complex media indicators
-        complex_terms = ['agar', 'broth', 'extract', 'peptone', 'yeast']
-        if any(term in name for term in complex_terms):
+        if _COMPLEX_RE.search(name):
             return 'COMPLEX'
 
         # Check for minimal media indicators
-        minimal_terms = ['minimal', 'defined', 'synthetic']
-        if any(term in name for term in minimal_terms):
+        if _MINIMAL_RE.search(name):
             return 'DEFINED'
 
         # KOMODO media are typically well-defined with molar concentrations
         # Default to DEFINED
         return 'DEFINED'
 
-    def _infer_physical_state(self, medium: Dict) -> str:
+    def _infer_physical_state(self, medium: Dict, name_lower: Optional[str] = None) -> str:
         """
         Infer physical state from name.
 
         Args:
             medium: KOMODO media dictionary
+            name_lower: Precomputed lowercased medium name (optional)
 
         Returns:
             Physical state (LIQUID, SOLID_AGAR)
         """
-        name = medium.get('name', '').lower()
+        name = name_lower if name_lower is not None else medium.get('name', '').lower()
 
         # Check for agar
         if 'agar' in name:
@@ -359,24 +438,25 @@ class KOMODOImporter:
         # Default to liquid
         return 'LIQUID'
 
-    def _infer_category(self, medium: Dict) -> str:
+    def _infer_category(self, medium: Dict, name_lower: Optional[str] = None) -> str:
         """
         Determine media category for file organization.
 
         Args:
             medium: KOMODO media dictionary
+            name_lower: Precomputed lowercased medium name (optional)
 
         Returns:
             Category name (bacterial, fungal, archaea, specialized)
         """
-        name = medium.get('name', '').lower()
+        name = name_lower if name_lower is not None else medium.get('name', '').lower()
 
         # Category keywords
-        if any(term in name for term in ['fungi', 'fungal', 'yeast', 'mold', 'mould']):
+        if _FUNGAL_RE.search(name):
             return 'fungal'
-        elif any(term in name for term in ['archaea', 'archaeal', 'halophil', 'methanogen']):
+        elif _ARCHAEA_RE.search(name):
             return 'archaea'
-        elif any(term in name for term in ['marine', 'seawater', 'extreme', 'anaerobic']):
+        elif _SPECIALIZED_RE.search(name):
             return 'specialized'
         else:
             return 'bacterial'  # Default
@@ -391,9 +471,11 @@ class KOMODOImporter:
         Returns:
             List with curation event
         """
+        timestamp = self._import_timestamp or datetime.utcnow().isoformat() + 'Z'
+
         return [
             {
-                'timestamp': datetime.utcnow().isoformat() + 'Z',
+                'timestamp': timestamp,
                 'curator': self.curator,
                 'action': 'Imported from KOMODO',
                 'notes': (
@@ -414,95 +496,86 @@ class KOMODOImporter:
         Returns:
             Sanitized filename-safe string
         """
-        # Replace non-alphanumeric characters with underscore
-        clean_name = ''
-        for char in name:
-            if char.isalnum() or char in ['-', '.']:
-                clean_name += char
-            else:
-                clean_name += '_'
-
-        # Collapse multiple underscores
-        while '__' in clean_name:
-            clean_name = clean_name.replace('__', '_')
-
-        # Remove leading/trailing underscores
-        clean_name = clean_name.strip('_')
-
-        # Limit length
-        if len(clean_name) > 50:
-            clean_name = clean_name[:50]
-
-        return clean_name
-
-    def _check_duplicate(self, medium: Dict) -> bool:
-        """
-        Check if medium already exists in knowledge base.
+        return sanitize_filename_part(name).strip('_')[:50]
 
-        Args:
-            medium: KOMODO media dictionary
+    @cached_property
+    def _existing_names(self) -> List[str]:
+        """Lowercased names of non-KOMODO recipes already in the knowledge base.
 
-        Returns:
-            True if duplicate found, False otherwise
+        Loaded once per importer; KOMODO imports only add KOMODO files, which
+        duplicate checks ignore, so the list stays valid during import_all.
         """
-        name = medium.get('name', '').lower()
-
-        # Check for exact name matches in existing files
+        names = []
         for category in ['bacterial', 'fungal', 'archaea', 'specialized', 'algae']:
-            kb_dir = self.output_dir / category
-            if not kb_dir.exists():
+            kb_dir = os.path.join(self.output_dir, category)
+            try:
+                entries = list(os.scandir(kb_dir))
+            except FileNotFoundError:
                 continue
 
-            for yaml_file in kb_dir.glob('*.yaml'):
+            for entry in entries:
                 # Skip KOMODO files (we're importing KOMODO)
-                if 'KOMODO' in yaml_file.name:
+                if not entry.name.endswith('.yaml') or 'KOMODO' in entry.name:
                     continue
 
                 try:
-                    with open(yaml_file, encoding='utf-8') as f:
+                    with open(entry.path, encoding='utf-8') as f:
                         existing = yaml.safe_load(f)
-
-                    existing_name = existing.get('name', '').lower()
-
-                    # Simple name matching
-                    if name == existing_name:
-                        logger.debug(f"Duplicate found: {name} = {existing_name}")
-                        return True
-
-                    # Fuzzy matching (>90% similarity)
-                    similarity = self._name_similarity(name, existing_name)
-                    if similarity > 0.9:
-                        logger.debug(f"Similar media found: {name} ≈ {existing_name} ({similarity:.2%})")
-                        return True
-
+                    names.append(existing.get('name', '').lower())
                 except Exception as e:
-                    logger.debug(f"Error checking duplicate in {yaml_file}: {e}")
+                    logger.debug(f"Error checking duplicate in {entry.path}: {e}")
 
-        return False
+        return names
+
+    @cached_property
+    def _existing_name_index(self) -> tuple:
+        """(name set, word set per name, word -> name indices) for duplicate checks."""
+        word_sets = [frozenset(name.split()) for name in self._existing_names]
+        word_index = defaultdict(list)
+        for i, words in enumerate(word_sets):
+            for word in words:
+                word_index[word].append(i)
+        return set(self._existing_names), word_sets, word_index
 
-    def _name_similarity(self, name1: str, name2: str) -> float:
+    def _check_duplicate(self, medium: Dict, name_lower: Optional[str] = None) -> bool:
         """
-        Calculate similarity between two names using Jaccard index.
+        Check if medium already exists in knowledge base.
+
+        Fuzzy (Jaccard) scoring only runs against existing names that share
+        at least one word with this medium, found via an inverted index;
+        names sharing no words have similarity 0 and cannot match.
 
         Args:
-            name1: First name
-            name2: Second name
+            medium: KOMODO media dictionary
+            name_lower: Precomputed lowercased medium name (optional)
 
         Returns:
-            Similarity score (0-1)
+            True if duplicate found, False otherwise
         """
-        # Convert to sets of words
-        words1 = set(name1.lower().split())
-        words2 = set(name2.lower().split())
-
-        # Jaccard index
-        intersection = words1 & words2
-        union = words1 | words2
-
-        if not union:
-            return 0.0
+        name = name_lower if name_lower is not None else medium.get('name', '').lower()
+        existing_names, word_sets, word_index = self._existing_name_index
+
+        # Simple name matching
+        if name in existing_names:
+            logger.debug(f"Duplicate found: {name}")
+            return True
+
+        # Fuzzy matching (>90% similarity)
+        words = frozenset(name.split())
+        candidates = set()
+        for word in words:
+            candidates.update(word_index.get(word, ()))
+
+        for i in candidates:
+            shared = len(words & word_sets[i])
+            similarity = shared / (len(words) + len(word_sets[i]) - shared)
+            if similarity > 0.9:
+                logger.debug(
+                    f"Similar media found: {name} ≈ {self._existing_names[i]} ({similarity:.2%})"
+                )
+                return True
 
-        return len(intersection) / len(union)
+        return False
 
     def get_statistics(self) -> Dict:
         """Get statistics about KOMODO import."""
@@ -514,14 +587,9 @@ class KOMODOImporter:
             'media_by_category': {}
         }
 
-        # Count by type
-        for medium in self.media:
-            medium_type = self._infer_medium_type(medium)
+        # Count by type and category
+        for _, medium_type, category in self._inferences:
             stats['media_by_type'][medium_type] = stats['media_by_type'].get(medium_type, 0) + 1
-
-        # Count by category
-        for medium in self.media:
-            category = self._infer_category(medium)
             stats['media_by_category'][category] = stats['media_by_category'].get(category, 0) + 1
 
         return stats
@@ -551,6 +619,11 @@ def main():
         type=int,
         help="Limit number of media to import"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
     parser.add_argument(
         "--stats",
         action="store_true",
@@ -588,7 +661,7 @@ def main():
         print("\nKOMODO Import Statistics:")
         print(json.dumps(stats, indent=2))
     else:
-        importer.import_all(limit=args.limit)
+        importer.import_all(limit=args.limit, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -8,16 +8,33 @@ Converts KOMODO web table data into CultureMech YAML files with:
 - Duplicate detection
 """
 
+import hashlib
 import json
 import logging
-import re
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-import yaml
+from culturemech.utils.filename_utils import sanitize_filename_part
+from culturemech.utils.json_utils import load_json_file
+from culturemech.utils.parallel import map_in_order
+from culturemech.utils.yaml_utils import dump_recipe_yaml
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# KOMODO IDs use hyphens in filenames ('1.0_a' -> '1-0-a')
+_ID_SANITIZE_TABLE = str.maketrans('._', '--')
+
+# Buffer size for the JSONL bundle, which receives many small writes
+_BUNDLE_BUFFER_SIZE = 1024 * 1024
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -43,26 +60,49 @@ class KomodoWebImporter:
             output_dir: Root directory for kb/media/
             limit: Optional limit for testing (default: None = all media)
         """
-        self.input_dir = Path(input_dir)
-        self.output_dir = Path(output_dir)
+        self.input_dir = input_dir if isinstance(input_dir, Path) else Path(input_dir)
+        self.output_dir = output_dir if isinstance(output_dir, Path) else Path(output_dir)
         self.limit = limit
 
-        # Load source data
+        # Source data is parsed lazily in import_all
         self.media_file = self.input_dir / "komodo_web_media.json"
         if not self.media_file.exists():
             raise FileNotFoundError(f"KOMODO media file not found: {self.media_file}")
 
-        with open(self.media_file) as f:
-            data = json.load(f)
-            self.media_records = data.get("data", [])
-
         # Tracking
-        self.generated_filenames = {}  # {filename: [medium_id1, ...]}
+        # Raw KOMODO IDs; the "KOMODO:" prefix is only added when reporting
+        self._first_ids: Dict[str, str] = {}  # {filename: first KOMODO ID}
+        self._collisions: Dict[str, List[str]] = {}  # {filename: [all IDs]}, collisions only
+        self._content_digests: Dict[str, bytes] = {}  # {filename: digest}, collisions only
+        self.content_duplicate_count = 0
         self.duplicate_count = 0
         self.import_count = 0
         self.skip_count = 0
-
-    def import_all(self):
+        self._category_dirs: Dict[str, Path] = {}  # created category directories
+        self._import_timestamp: Optional[str] = None
+        self._curation_template: Optional[Dict[str, str]] = None
+
+        # Background writers (only active inside import_all)
+        self._write_pool: Optional[ThreadPoolExecutor] = None
+        self._pending_writes: deque = deque()
+        self._max_pending_writes = 0
+        self._bundle = None  # open JSONL bundle file, if requested
+        self._bundle_records = False  # whether _prepare_medium emits bundle lines
+
+    def __getstate__(self):
+        """Drop open file and thread handles when sent to worker processes."""
+        state = self.__dict__.copy()
+        state.update(_bundle=None, _write_pool=None, _pending_writes=deque())
+        return state
+
+    def import_all(
+        self,
+        io_threads: int = 4,
+        max_pending: int = 256,
+        bundle_path: Optional[Path] = None,
+        workers: Optional[int] = None,
+        chunksize: int = 64,
+    ):
         """
         Import all KOMODO media to YAML files.
 
@@ -71,24 +111,76 @@ class KomodoWebImporter:
         2. Convert to CultureMech format
         3. Write YAML files
         4. Report statistics
+
+        Conversion and serialization run in a process pool; duplicate
+        tracking and file writes stay in this process, in input order.
+
+        Args:
+            io_threads: Threads writing YAML files in the background while
+                the next records are converted (0 = write inline)
+            max_pending: Maximum number of queued writes
+            bundle_path: Optional JSONL file that additionally receives every
+                imported recipe, one JSON object per line
+            workers: Number of worker processes (default: CPU count; 1 = serial)
+            chunksize: Records sent to a worker process per task
         """
         logger.info("=" * 60)
         logger.info("KOMODO Web Table Importer")
         logger.info("=" * 60)
 
-        total = len(self.media_records)
+        # One timestamp for the whole import batch
+        self._import_timestamp = self._utc_timestamp()
+        self._curation_template = self._build_curation_template(self._import_timestamp)
+
+        records = self._iter_records()
         if self.limit:
-            total = min(total, self.limit)
+            records = islice(records, self.limit)
             logger.info(f"Limiting to {self.limit} media for testing")
 
-        logger.info(f"\nProcessing {total} KOMODO media...")
+        logger.info(f"\nProcessing KOMODO media from {self.media_file}...")
         logger.info("")
 
-        for i, record in enumerate(self.media_records[:total], 1):
-            if i % 50 == 0 or i == total:
-                logger.info(f"  Progress: {i}/{total} ({i/total*100:.1f}%)")
+        total = 0
+        # Report progress ~100 times for a known size, otherwise every 50 media
+        progress_step = max(50, self.limit // 100) if self.limit else 50
+        log_progress = logger.isEnabledFor(logging.INFO)
+        prepared_records = None
+        if io_threads > 0:
+            self._write_pool = ThreadPoolExecutor(max_workers=io_threads)
+            self._max_pending_writes = max_pending
+        if bundle_path is not None:
+            Path(bundle_path).parent.mkdir(parents=True, exist_ok=True)
+            self._bundle = open(
+                bundle_path, 'w', encoding='utf-8', buffering=_BUNDLE_BUFFER_SIZE
+            )
+            self._bundle_records = True
+        try:
+            # Bounded submission keeps a streamed source file out of memory
+            prepared_records = map_in_order(
+                self._prepare_medium, records,
+                workers=workers, chunksize=chunksize, max_pending_chunks=4,
+            )
 
-            self._import_medium(record)
+            for total, (prepared, error) in enumerate(prepared_records, 1):
+                if error:
+                    raise RuntimeError(f"Error converting KOMODO record {total}: {error}")
+
+                if log_progress and total % progress_step == 0:
+                    logger.info(f"  Progress: {total} media processed")
+
+                self._store_medium(prepared)
+            self._drain_writes()
+        finally:
+            if prepared_records is not None:
+                prepared_records.close()
+            if self._write_pool is not None:
+                self._write_pool.shutdown()
+                self._write_pool = None
+            self._pending_writes.clear()
+            if self._bundle is not None:
+                self._bundle.close()
+                self._bundle = None
+            self._bundle_records = False
 
         # Report duplicates
         self._report_duplicates()
@@ -99,90 +191,194 @@ class KomodoWebImporter:
         logger.info(f"  Imported: {self.import_count}/{total}")
         logger.info(f"  Skipped: {self.skip_count}")
         logger.info(f"  Duplicates: {self.duplicate_count}")
+        logger.info(f"  Identical rewrites skipped: {self.content_duplicate_count}")
         logger.info(f"  Output: {self.output_dir}")
+        if bundle_path is not None:
+            logger.info(f"  Bundle: {bundle_path}")
         logger.info("=" * 60)
 
-    def _import_medium(self, record: Dict[str, Any]):
-        """Import a single KOMODO medium to YAML."""
+    def _prepare_medium(self, record: Dict[str, Any]) -> Optional[tuple]:
+        """
+        Convert and serialize a single KOMODO medium.
+
+        Has no side effects, so it can run in a worker process.
+
+        Args:
+            record: KOMODO medium record
+
+        Returns:
+            (komodo_id, name, category, filename, yaml_bytes, bundle_line),
+            or None if the record has no ID
+        """
         komodo_id = record.get('id')
         if not komodo_id:
-            logger.warning("Skipping record with no ID")
-            self.skip_count += 1
-            return
+            return None
+        name = record['name']
 
         # Convert to CultureMech format
-        recipe = self._convert_to_culturemech(record)
+        recipe = self._convert_to_culturemech(record, komodo_id, name)
+
+        bundle_line = None
+        if self._bundle_records:
+            bundle_line = json.dumps(recipe, ensure_ascii=False) + '\n'
 
         # Determine category (default to bacterial for now)
         category = self._infer_category(record)
 
         # Generate filename
-        filename = self._generate_filename(record, category)
+        filename = self._format_filename(komodo_id, name)
+
+        data = dump_recipe_yaml(recipe).encode('utf-8')
+        return komodo_id, name, category, filename, data, bundle_line
+
+    def _store_medium(self, prepared: Optional[tuple]):
+        """Track duplicates for and write the output of _prepare_medium."""
+        if prepared is None:
+            logger.warning("Skipping record with no ID")
+            self.skip_count += 1
+            return
+
+        komodo_id, name, category, filename, data, bundle_line = prepared
+        if bundle_line is not None:
+            self._bundle.write(bundle_line)
+
         full_filename = f"{category}/{filename}"
 
         # Check for duplicate filenames
-        if full_filename in self.generated_filenames:
+        first_id = self._first_ids.get(full_filename)
+        if first_id is None:
+            self._first_ids[full_filename] = komodo_id
+        else:
             self.duplicate_count += 1
-            existing_ids = ", ".join(self.generated_filenames[full_filename])
+            medium_ids = self._collisions.setdefault(full_filename, [first_id])
+            existing_ids = ", ".join(f"KOMODO:{med_id}" for med_id in medium_ids)
             logger.warning(
                 f"⚠️  DUPLICATE FILENAME: {filename}\n"
                 f"   Category: {category}\n"
-                f"   Current medium: KOMODO:{komodo_id} ('{record.get('name')}')\n"
+                f"   Current medium: KOMODO:{komodo_id} ('{name}')\n"
                 f"   Previous medium(s): {existing_ids}\n"
                 f"   File will be OVERWRITTEN!"
             )
-
-        # Track filename
-        if full_filename not in self.generated_filenames:
-            self.generated_filenames[full_filename] = []
-        self.generated_filenames[full_filename].append(f"KOMODO:{komodo_id}")
+            medium_ids.append(komodo_id)
 
         # Write YAML file
-        category_dir = self.output_dir / category
-        category_dir.mkdir(parents=True, exist_ok=True)
+        category_dir = self._category_dirs.get(category)
+        if category_dir is None:
+            category_dir = self.output_dir / category
+            category_dir.mkdir(parents=True, exist_ok=True)
+            self._category_dirs[category] = category_dir
 
         output_path = category_dir / filename
-        with open(output_path, 'w', encoding='utf-8') as f:
-            yaml.dump(recipe, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        if first_id is not None:
+            # Earlier writes to this path must land before it is compared
+            # or overwritten
+            self._drain_writes()
+            if self._is_unchanged(full_filename, output_path, data):
+                self.content_duplicate_count += 1
+                self.import_count += 1
+                return
+        self._write_file(output_path, data)
 
         self.import_count += 1
 
-    def _convert_to_culturemech(self, record: Dict[str, Any]) -> Dict[str, Any]:
+    def _write_file(self, output_path: Path, data: bytes):
+        """Write a file, in the background when a writer pool is active."""
+        if self._write_pool is None:
+            output_path.write_bytes(data)
+            return
+        self._pending_writes.append(self._write_pool.submit(output_path.write_bytes, data))
+        if len(self._pending_writes) >= self._max_pending_writes:
+            self._pending_writes.popleft().result()
+
+    def _drain_writes(self):
+        """Wait for all queued background writes, re-raising any error."""
+        while self._pending_writes:
+            self._pending_writes.popleft().result()
+
+    def _is_unchanged(self, full_filename: str, output_path: Path, data: bytes) -> bool:
+        """
+        Check whether a colliding file already holds identical content.
+
+        Only called for filename collisions, so unique filenames are never
+        hashed. The digest of the first file in a collision group is taken
+        from disk; later writes record theirs.
+
+        Args:
+            full_filename: Category-relative filename
+            output_path: Path the recipe would be written to
+            data: Serialized recipe
+
+        Returns:
+            True if the file on disk already has this content
+        """
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        previous = self._content_digests.get(full_filename)
+        if previous is None:
+            try:
+                previous = hashlib.blake2b(output_path.read_bytes(), digest_size=16).digest()
+            except OSError:
+                previous = b''
+        self._content_digests[full_filename] = digest
+        return digest == previous
+
+    def _iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield media records from the KOMODO web JSON file.
+
+        Records are streamed from the ``data`` array with ijson when it is
+        installed, so the whole document is never held in memory; otherwise
+        the file is loaded in one go (with orjson when available).
+        """
+        if HAS_IJSON:
+            with open(self.media_file, 'rb') as f:
+                yield from ijson.items(f, 'data.item', use_float=True)
+        else:
+            yield from load_json_file(self.media_file).get("data", [])
+
+    def _convert_to_culturemech(
+        self,
+        record: Dict[str, Any],
+        komodo_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Convert KOMODO record to CultureMech YAML format.
 
         Creates a media recipe with KOMODO metadata, preserving DSMZ
         mapping for future composition merge.
+
+        Args:
+            record: KOMODO medium record
+            komodo_id: Record ID, if already read from the record
+            name: Record name, if already read from the record
         """
-        komodo_id = record['id']
-        name = record['name']
+        if komodo_id is None:
+            komodo_id = record['id']
+        if name is None:
+            name = record['name']
 
         recipe = {
             "name": name,
             "original_name": name,
-            "category": "imported"
+            "category": "imported",
+            "medium_type": "COMPLEX" if record.get('is_complex') else "DEFINED",
+            # Physical state (unknown from KOMODO data, default to LIQUID)
+            "physical_state": "LIQUID",
         }
 
-        # Medium type
-        if record.get('is_complex'):
-            recipe['medium_type'] = "COMPLEX"
-        else:
-            recipe['medium_type'] = "DEFINED"
-
-        # Physical state (unknown from KOMODO data, default to LIQUID)
-        recipe['physical_state'] = "LIQUID"
-
         # pH information
-        if record.get('ph_value'):
-            recipe['ph_value'] = float(record['ph_value'])
-        elif record.get('ph_range'):
-            recipe['ph_range'] = record['ph_range']
+        ph_value = record.get('ph_value')
+        if ph_value:
+            recipe['ph_value'] = float(ph_value)
+        else:
+            ph_range = record.get('ph_range')
+            if ph_range:
+                recipe['ph_range'] = ph_range
 
-        if record.get('ph_buffer'):
-            if 'notes' in recipe:
-                recipe['notes'] += f" | pH buffer: {record['ph_buffer']}"
-            else:
-                recipe['notes'] = f"pH buffer: {record['ph_buffer']}"
+        # With a pH buffer, 'notes' is placed before media_term (filled in below)
+        ph_buffer = record.get('ph_buffer')
+        if ph_buffer:
+            recipe['notes'] = None
 
         # Media term (KOMODO ID for kg-microbe compatibility)
         recipe['media_term'] = {
@@ -194,35 +390,44 @@ class KomodoWebImporter:
         }
 
         # Add source notes with DSMZ mapping (for future merge)
-        source_notes = f"Source: KOMODO ModelSEED | ID: {komodo_id}"
-        if record.get('dsmz_medium_number'):
-            source_notes += f" | DSMZ Medium: {record['dsmz_medium_number']} (mediadive.medium:{record['dsmz_medium_number']})"
-        if record.get('is_aerobic') is not None:
-            source_notes += f" | Aerobic: {'Yes' if record['is_aerobic'] else 'No'}"
+        notes = [f"pH buffer: {ph_buffer}"] if ph_buffer else []
+        notes += ("Source: KOMODO ModelSEED", f"ID: {komodo_id}")
+        dsmz = record.get('dsmz_medium_number')
+        if dsmz:
+            notes.append(f"DSMZ Medium: {dsmz} (mediadive.medium:{dsmz})")
+        aerobic = record.get('is_aerobic')
+        if aerobic is not None:
+            notes.append("Aerobic: Yes" if aerobic else "Aerobic: No")
         if record.get('is_submedium'):
-            source_notes += " | SubMedium: Yes"
+            notes.append("SubMedium: Yes")
+        recipe['notes'] = " | ".join(notes)
 
-        if 'notes' in recipe:
-            recipe['notes'] += f" | {source_notes}"
-        else:
-            recipe['notes'] = source_notes
+        recipe.update(
+            # Placeholder ingredients (required by schema, will be populated during DSMZ merge)
+            # The DSMZ merge step will add composition data using the DSMZ medium number
+            ingredients=[],
+            applications=["Microbial cultivation"],
+        )
 
-        # Placeholder ingredients (required by schema, will be populated during DSMZ merge)
-        # The DSMZ merge step will add composition data using the DSMZ medium number
-        recipe['ingredients'] = []
+        # Curation history
+        template = self._curation_template or self._build_curation_template(self._utc_timestamp())
+        recipe['curation_history'] = [{**template, "notes": f"Source: KOMODO, ID: {komodo_id}"}]
 
-        # Applications
-        recipe['applications'] = ["Microbial cultivation"]
+        return recipe
 
-        # Curation history
-        recipe['curation_history'] = [{
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.%fZ", time.gmtime()),
+    @staticmethod
+    def _utc_timestamp() -> str:
+        """Return the current UTC time as an ISO 8601 string ending in 'Z'."""
+        return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+    @staticmethod
+    def _build_curation_template(timestamp: str) -> Dict[str, str]:
+        """Return the curation history fields shared by every record in a run."""
+        return {
+            "timestamp": timestamp,
             "curator": "komodo-web-import",
             "action": "Imported from KOMODO web table",
-            "notes": f"Source: KOMODO, ID: {komodo_id}"
-        }]
-
-        return recipe
+        }
 
     def _infer_category(self, record: Dict[str, Any]) -> str:
         """
@@ -235,35 +440,26 @@ class KomodoWebImporter:
         # For now, use bacterial as default
         return "bacterial"
 
-    def _generate_filename(self, record: Dict[str, Any], category: str) -> str:
+    def _format_filename(self, komodo_id: str, name: str) -> str:
         """
-        Generate sanitized filename for KOMODO medium.
+        Generate sanitized filename for a KOMODO medium.
 
         Format: KOMODO_{ID}_{SANITIZED_NAME}.yaml
 
         Args:
-            record: KOMODO medium record
-            category: Medium category
+            komodo_id: KOMODO medium ID
+            name: Medium name
 
         Returns:
             Sanitized filename
         """
-        komodo_id = record['id']
-        name = record['name']
-
         # Sanitize ID (replace dots, underscores with hyphens for consistency)
-        sanitized_id = komodo_id.replace('.', '-').replace('_', '-')
+        sanitized_id = komodo_id.translate(_ID_SANITIZE_TABLE)
 
-        # Sanitize name
+        # Sanitize name (truncated to 80 chars)
         sanitized_name = self._sanitize_filename(name)
 
-        # Truncate long names (max 80 chars for filename)
-        if len(sanitized_name) > 80:
-            sanitized_name = sanitized_name[:80]
-
-        filename = f"KOMODO_{sanitized_id}_{sanitized_name}.yaml"
-
-        return filename
+        return f"KOMODO_{sanitized_id}_{sanitized_name}.yaml"
 
     def _sanitize_filename(self, name: str) -> str:
         r"""
@@ -278,19 +474,11 @@ class KomodoWebImporter:
         4. Non-ASCII: ° ´ and all other non-ASCII characters
 
         KEEPS ONLY: a-z, A-Z, 0-9, -, .
-        """
-        clean_name = ''
-        for char in name:
-            if char.isalnum() or char in ['-', '.']:
-                clean_name += char
-            else:
-                clean_name += '_'
 
-        # Collapse multiple consecutive underscores
-        while '__' in clean_name:
-            clean_name = clean_name.replace('__', '_')
-
-        return clean_name.strip('_')
+        Runs of replaced characters collapse to a single underscore, and
+        the result is truncated to 80 characters.
+        """
+        return sanitize_filename_part(name).strip('_')[:80]
 
     def _report_duplicates(self):
         """Report duplicate filename statistics."""
@@ -298,11 +486,7 @@ class KomodoWebImporter:
             logger.info("\n✓ No duplicate filenames detected - all files are unique")
             return
 
-        # Find duplicates
-        duplicates = {
-            fname: ids for fname, ids in self.generated_filenames.items()
-            if len(ids) > 1
-        }
+        duplicates = self._collisions
 
         logger.warning(f"\n⚠️  DUPLICATE FILENAME SUMMARY")
         logger.warning("=" * 60)
@@ -316,8 +500,8 @@ class KomodoWebImporter:
             logger.warning(f"Filename: {filename}")
             logger.warning(f"  Conflicts: {len(medium_ids)} media mapped to same file")
             for i, med_id in enumerate(medium_ids, 1):
-                logger.warning(f"    {i}. {med_id}")
-            logger.warning(f"  → Only the LAST one ({medium_ids[-1]}) was saved!")
+                logger.warning(f"    {i}. KOMODO:{med_id}")
+            logger.warning(f"  → Only the LAST one (KOMODO:{medium_ids[-1]}) was saved!")
             logger.warning("")
 
         logger.warning("=" * 60)
@@ -330,6 +514,8 @@ def main():
     """CLI entry point."""
     import argparse
 
+    logging.basicConfig(level=logging.INFO)
+
     parser = argparse.ArgumentParser(
         description="Import KOMODO media from web table to CultureMech YAML"
     )
@@ -350,6 +536,16 @@ def main():
         type=int,
         help="Limit number of media to import (for testing)"
     )
+    parser.add_argument(
+        "--bundle",
+        type=Path,
+        help="Also write all imported recipes to this JSONL file (one recipe per line)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
 
     args = parser.parse_args()
 
@@ -359,7 +555,7 @@ def main():
         limit=args.limit
     )
 
-    importer.import_all()
+    importer.import_all(bundle_path=args.bundle, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -19,21 +19,125 @@ Reference:
 - https://mediadb.systemsbiology.net/
 """
 
-import json
+import os
 import yaml
 import re
+from collections import defaultdict
+from contextlib import closing
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, timezone
 import logging
 from importlib import import_module
 
+from culturemech.utils.filename_utils import sanitize_filename_part
+from culturemech.utils.json_utils import dumps_json, load_json_file
+from culturemech.utils.parallel import map_in_order
+from culturemech.utils.yaml_utils import dump_recipe_yaml, plain_scalar_is_str
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 # Import from module with reserved keyword name
 ChemicalMapper = import_module('culturemech.import.chemical_mappings').ChemicalMapper
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Category keyword patterns (matched against lowercased names)
+_FUNGAL_RE = re.compile(r'fungi|fungal|yeast|mold')
+_ARCHAEA_RE = re.compile(r'archaea|archaeal')
+_SPECIALIZED_RE = re.compile(r'marine|seawater')
+
+# Compound cross-reference fields and their note prefixes, in output order
+_XREF_KEYS = (
+    ('kegg_id', 'KEGG'),
+    ('bigg_id', 'BiGG'),
+    ('seed_id', 'SEED'),
+    ('pubchem_id', 'PubChem'),
+)
+
+# MediaDB concentration units -> CultureMech unit enums
+_UNIT_MAP = {
+    'g/L': 'G_PER_L',
+    'mg/L': 'MG_PER_L',
+    'ml/L': 'ML_PER_L',
+    'µg/L': 'MICROG_PER_L',
+    'μg/L': 'MICROG_PER_L',
+    'mM': 'MILLIMOLAR',
+    'µM': 'MICROMOLAR',
+    'μM': 'MICROMOLAR',
+    'M': 'MOLAR',
+    '%': 'PERCENT_W_V',
+    'g': 'G_PER_L',
+    'mg': 'MG_PER_L',
+    'ml': 'ML_PER_L',
+}
+
+# Preparation steps shared by every (chemically defined) MediaDB medium
+_PREPARATION_STEPS = [
+    {
+        'step_number': 1,
+        'action': 'DISSOLVE',
+        'description': 'Dissolve all ingredients in distilled water to specified concentrations'
+    },
+    {
+        'step_number': 2,
+        'action': 'ADJUST_PH',
+        'description': 'Adjust pH if specified in original formulation'
+    },
+    {
+        'step_number': 3,
+        'action': 'FILTER_STERILIZE',
+        'description': 'Sterilize by filtration (0.22 μm) to preserve heat-sensitive components'
+    }
+]
+
+# Top-level 'name:' line whose value is a one-line plain scalar (no quotes,
+# leading indicators or comments), which reads back as the literal text
+_NAME_LINE_RE = re.compile(
+    rb'^name:[ \t]+([^\s\-?:,\[\]{}#&*!|>\'"%@`][^#\r\n]*?)[ \t]*\r?$', re.M
+)
+
+# Recipe names sit near the top of the file
+_NAME_HEAD_BYTES = 4096
+
+
+def _read_recipe_name(path: Union[str, Path]) -> Optional[Any]:
+    """
+    Read the top-level ``name`` of a recipe YAML file.
+
+    Only the head of the file is scanned when the name is a simple plain
+    scalar; anything else (quoted, multi-line, non-string, or not found
+    near the top) falls back to a full YAML parse.
+
+    Args:
+        path: Recipe YAML file
+
+    Returns:
+        The name value, or None if the document has no name
+    """
+    with open(path, 'rb') as f:
+        head = f.read(_NAME_HEAD_BYTES)
+        match = _NAME_LINE_RE.search(head)
+        # The value must not continue on an indented next line
+        if match and head[match.end() + 1:match.end() + 2] not in (b' ', b'\t', b''):
+            value = match.group(1).decode('utf-8')
+            if (
+                ': ' not in value
+                and not value.endswith(':')
+                and plain_scalar_is_str(value)
+            ):
+                return value
+        existing = yaml.load((head + f.read()).decode('utf-8'), Loader=SafeLoader)
+
+    if existing and 'name' in existing:
+        return existing['name']
+    return None
+
 
 class MediaDBImporter:
     """Import MediaDB media data into CultureMech format."""
@@ -76,6 +180,12 @@ class MediaDBImporter:
         # Initialize chemical mapper
         self.chemical_mapper = chemical_mapper
 
+        # Shared curation timestamp, set once per import_all run
+        self._import_timestamp: Optional[str] = None
+
+        # ChEBI mappings by compound common name, resolved in bulk by import_all
+        self._chebi_cache: Dict[str, Optional[Dict]] = {}
+
         # Cache existing media names for duplicate checking
         self.existing_media_names = self._load_existing_media_names()
 
@@ -91,72 +201,123 @@ class MediaDBImporter:
             logger.warning(f"File not found: {path}")
             return {'count': 0, 'data': []}
 
-        with open(path, encoding='utf-8') as f:
-            return json.load(f)
+        return load_json_file(path)
 
-    def _load_existing_media_names(self) -> set:
-        """Load existing media names from KB for duplicate checking."""
+    def _load_existing_media_names(self) -> FrozenSet[str]:
+        """Load existing (lowercased) media names from KB for duplicate checking."""
         existing_names = set()
 
         # Scan all categories
         for category in ['bacterial', 'fungal', 'archaea', 'specialized', 'algae']:
-            kb_dir = self.output_dir / category
-            if not kb_dir.exists():
+            kb_dir = os.path.join(self.output_dir, category)
+            try:
+                entries = list(os.scandir(kb_dir))
+            except (FileNotFoundError, NotADirectoryError):
                 continue
 
-            for yaml_file in kb_dir.glob('*.yaml'):
+            for entry in entries:
                 # Skip MediaDB files (we're importing MediaDB)
-                if 'MEDIADB' in yaml_file.name:
+                if not entry.name.endswith('.yaml') or 'MEDIADB' in entry.name:
                     continue
 
                 try:
-                    with open(yaml_file, encoding='utf-8') as f:
-                        existing = yaml.safe_load(f)
-
-                    if existing and 'name' in existing:
-                        existing_names.add(existing['name'].lower())
+                    name = _read_recipe_name(entry.path)
+                    if name is not None:
+                        existing_names.add(name.lower())
                 except Exception as e:
-                    logger.debug(f"Error loading {yaml_file}: {e}")
+                    logger.debug(f"Error loading {entry.path}: {e}")
 
-        return existing_names
+        return frozenset(existing_names)
 
-    def import_all(self, limit: Optional[int] = None) -> List[Path]:
+    def import_all(
+        self,
+        limit: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> List[Path]:
         """
         Import all MediaDB media to CultureMech format.
 
         Args:
             limit: Optional limit on number of media to import
+            workers: Number of worker processes (default: CPU count; 1 = serial)
 
         Returns:
             List of generated YAML file paths
         """
-        generated = []
+        return list(self.iter_import_all(limit=limit, workers=workers))
+
+    def iter_import_all(
+        self,
+        limit: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> Iterator[Path]:
+        """
+        Import all MediaDB media, yielding each YAML path as it is written.
+
+        Duplicate checks run in this process; conversion and serialization
+        of the remaining media is spread across a process pool, and files
+        are written here in input order while workers keep rendering.
+
+        Args:
+            limit: Optional limit on number of media to import
+            workers: Number of worker processes (default: CPU count; 1 = serial)
+
+        Yields:
+            Generated YAML file paths
+        """
+        imported = 0
         media_list = self.media[:limit] if limit else self.media
+        self._import_timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        self._prefetch_chebi_mappings(media_list)
 
         logger.info(f"\nImporting {len(media_list)} MediaDB media recipes...")
 
         duplicates = 0
+        to_import = []
 
         for medium in media_list:
             try:
+                category = self._infer_category(medium)
+
                 # Check for duplicates
                 if self._check_duplicate(medium):
                     logger.debug(f"⊘ Skipped duplicate: {medium.get('name', 'Unknown')}")
                     duplicates += 1
                     continue
-
-                yaml_path = self.import_medium(medium)
-                if yaml_path:
-                    generated.append(yaml_path)
-                    logger.info(f"✓ Imported {yaml_path.name}")
             except Exception as e:
                 logger.error(
                     f"✗ Error importing {medium.get('name', 'Unknown')}: {e}"
                 )
+                continue
+            to_import.append((medium, category))
+
+        # Create each output category directory once rather than per file
+        for category in {category for _, category in to_import}:
+            (self.output_dir / category).mkdir(parents=True, exist_ok=True)
+
+        results = map_in_order(
+            self._render_medium, to_import, workers=workers, chunksize=8, unpack=True
+        )
+
+        with closing(results):
+            for (medium, _), (rendered, error) in zip(to_import, results):
+                yaml_path = None
+                if rendered and not error:
+                    try:
+                        yaml_path = self._write_rendered(*rendered)
+                    except Exception as e:
+                        error = str(e)
+                if error:
+                    logger.error(
+                        f"✗ Error importing {medium.get('name', 'Unknown')}: {error}"
+                    )
+                elif yaml_path:
+                    imported += 1
+                    logger.info(f"✓ Imported {yaml_path.name}")
+                    yield yaml_path
 
-        logger.info(f"\n✓ Imported {len(generated)}/{len(media_list)} media")
+        logger.info(f"\n✓ Imported {imported}/{len(media_list)} media")
         logger.info(f"⊘ Skipped {duplicates} duplicates")
-        return generated
 
     def import_medium(self, medium: Dict) -> Optional[Path]:
         """
@@ -168,6 +329,27 @@ class MediaDBImporter:
         Returns:
             Path to generated YAML file
         """
+        rendered = self._render_medium(medium)
+        if not rendered:
+            return None
+        rendered[0].parent.mkdir(parents=True, exist_ok=True)
+        return self._write_rendered(*rendered)
+
+    def _render_medium(
+        self,
+        medium: Dict,
+        category: Optional[str] = None,
+    ) -> Optional[Tuple[Path, str]]:
+        """
+        Convert a MediaDB medium and serialize it, without writing.
+
+        Args:
+            medium: MediaDB media dictionary
+            category: Precomputed category (inferred if not given)
+
+        Returns:
+            (output path, YAML text), or None if the medium has no name
+        """
         recipe = self._convert_to_culturemech(medium)
 
         if not recipe:
@@ -184,14 +366,15 @@ class MediaDBImporter:
         filename = f"MEDIADB_{medium_id}_{clean_name}.yaml"
 
         # Determine category (most MediaDB media are bacterial)
-        category = self._infer_category(medium)
+        if category is None:
+            category = self._infer_category(medium)
         output_path = self.output_dir / category / filename
-        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write YAML
-        with open(output_path, 'w', encoding='utf-8') as f:
-            yaml.dump(recipe, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        return output_path, dump_recipe_yaml(recipe)
 
+    def _write_rendered(self, output_path: Path, text: str) -> Path:
+        """Write serialized YAML in a single call (its directory must exist)."""
+        output_path.write_text(text, encoding='utf-8')
         return output_path
 
     def _convert_to_culturemech(self, medium: Dict) -> Optional[Dict]:
@@ -242,6 +425,40 @@ class MediaDBImporter:
 
         return recipe
 
+    def _prefetch_chebi_mappings(self, media_list: List[Dict]):
+        """
+        Resolve ChEBI mappings for every compound used by the given media.
+
+        Results are cached so _map_ingredients does a dict lookup instead of
+        one mapper call per ingredient.
+
+        Args:
+            media_list: MediaDB media dictionaries
+        """
+        if not self.chemical_mapper:
+            return
+
+        names = set()
+        for medium in media_list:
+            try:
+                for comp in medium.get('composition', []):
+                    compound = self.compounds_by_id.get(comp.get('compound_id'))
+                    if compound:
+                        names.add(self._compound_common_name(compound, comp['compound_id']))
+            except Exception:
+                # Malformed media are reported when they are imported
+                continue
+
+        self._chebi_cache.update(self.chemical_mapper.lookup_many(names))
+
+    @staticmethod
+    def _compound_common_name(compound: Dict, compound_id: Any) -> str:
+        """Return the common name used as a compound's preferred term."""
+        # MediaDB uses KEGG IDs as 'name' field
+        kegg_name = str(compound.get('name', compound_id))
+        # The 'chebi_id' field actually contains compound common names, not numeric IDs
+        return str(compound.get('chebi_id', kegg_name))
+
     def _map_ingredients(self, medium: Dict) -> List[Dict]:
         """
         Map MediaDB ingredients to CultureMech format.
@@ -265,10 +482,7 @@ class MediaDBImporter:
                 logger.debug(f"Compound not found for ID: {compound_id}")
                 continue
 
-            # MediaDB uses KEGG IDs as 'name' field
-            kegg_name = str(compound.get('name', compound_id))
-            # The 'chebi_id' field actually contains compound common names, not numeric IDs
-            common_name = str(compound.get('chebi_id', kegg_name))
+            common_name = self._compound_common_name(compound, compound_id)
 
             # Use common name as preferred term
             ingredient = {
@@ -277,7 +491,10 @@ class MediaDBImporter:
 
             # Try to get ChEBI ID from chemical mapper
             if self.chemical_mapper:
-                mapping = self.chemical_mapper.lookup(common_name)
+                if common_name in self._chebi_cache:
+                    mapping = self._chebi_cache[common_name]
+                else:
+                    mapping = self.chemical_mapper.lookup(common_name)
                 if mapping and mapping.get('chebi_id'):
                     chebi_id = str(mapping['chebi_id'])
                     if not chebi_id.startswith('CHEBI:'):
@@ -294,22 +511,7 @@ class MediaDBImporter:
 
             if concentration and unit:
                 # Map unit to CultureMech enums
-                unit_map = {
-                    'g/L': 'G_PER_L',
-                    'mg/L': 'MG_PER_L',
-                    'ml/L': 'ML_PER_L',
-                    'µg/L': 'MICROG_PER_L',
-                    'μg/L': 'MICROG_PER_L',
-                    'mM': 'MILLIMOLAR',
-                    'µM': 'MICROMOLAR',
-                    'μM': 'MICROMOLAR',
-                    'M': 'MOLAR',
-                    '%': 'PERCENT_W_V',
-                    'g': 'G_PER_L',
-                    'mg': 'MG_PER_L',
-                    'ml': 'ML_PER_L',
-                }
-                standard_unit = unit_map.get(unit, 'G_PER_L')
+                standard_unit = _UNIT_MAP.get(unit, 'G_PER_L')
 
                 ingredient['concentration'] = {
                     'value': str(concentration),
@@ -317,18 +519,13 @@ class MediaDBImporter:
                 }
 
             # Add cross-references as notes
-            xrefs = []
-            if compound.get('kegg_id'):
-                xrefs.append(f"KEGG:{compound['kegg_id']}")
-            if compound.get('bigg_id'):
-                xrefs.append(f"BiGG:{compound['bigg_id']}")
-            if compound.get('seed_id'):
-                xrefs.append(f"SEED:{compound['seed_id']}")
-            if compound.get('pubchem_id'):
-                xrefs.append(f"PubChem:{compound['pubchem_id']}")
-
+            xrefs = ', '.join(
+                f"{prefix}:{value}"
+                for key, prefix in _XREF_KEYS
+                if (value := compound.get(key))
+            )
             if xrefs:
-                ingredient['notes'] = f"Cross-references: {', '.join(xrefs)}"
+                ingredient['notes'] = f"Cross-references: {xrefs}"
 
             ingredients.append(ingredient)
 
@@ -355,25 +552,7 @@ class MediaDBImporter:
         Returns:
             List of preparation step dictionaries
         """
-        steps = [
-            {
-                'step_number': 1,
-                'action': 'DISSOLVE',
-                'description': 'Dissolve all ingredients in distilled water to specified concentrations'
-            },
-            {
-                'step_number': 2,
-                'action': 'ADJUST_PH',
-                'description': 'Adjust pH if specified in original formulation'
-            },
-            {
-                'step_number': 3,
-                'action': 'FILTER_STERILIZE',
-                'description': 'Sterilize by filtration (0.22 μm) to preserve heat-sensitive components'
-            }
-        ]
-
-        return steps
+        return _PREPARATION_STEPS
 
     def _infer_physical_state(self, medium: Dict) -> str:
         """
@@ -404,14 +583,14 @@ class MediaDBImporter:
         Returns:
             Category name (bacterial, fungal, archaea, specialized)
         """
-        name = medium.get('name', '').lower()
+        name = (medium.get('name') or '').lower()
 
         # Category keywords
-        if any(term in name for term in ['fungi', 'fungal', 'yeast', 'mold']):
+        if _FUNGAL_RE.search(name):
             return 'fungal'
-        elif any(term in name for term in ['archaea', 'archaeal']):
+        elif _ARCHAEA_RE.search(name):
             return 'archaea'
-        elif any(term in name for term in ['marine', 'seawater']):
+        elif _SPECIALIZED_RE.search(name):
             return 'specialized'
         else:
             return 'bacterial'  # Default (most MediaDB media are bacterial)
@@ -449,9 +628,13 @@ class MediaDBImporter:
         Returns:
             List with curation event
         """
+        timestamp = (
+            self._import_timestamp
+            or datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        )
         return [
             {
-                'timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                'timestamp': timestamp,
                 'curator': self.curator,
                 'action': 'Imported from MediaDB',
                 'notes': (
@@ -472,31 +655,35 @@ class MediaDBImporter:
         Returns:
             Sanitized filename-safe string
         """
-        # Replace non-alphanumeric characters with underscore
-        clean_name = ''
-        for char in name:
-            if char.isalnum() or char in ['-', '.']:
-                clean_name += char
-            else:
-                clean_name += '_'
-
-        # Collapse multiple underscores
-        while '__' in clean_name:
-            clean_name = clean_name.replace('__', '_')
-
-        # Remove leading/trailing underscores
-        clean_name = clean_name.strip('_')
-
-        # Limit length
-        if len(clean_name) > 50:
-            clean_name = clean_name[:50]
-
-        return clean_name
+        # Replace runs of non-alphanumeric characters with one underscore,
+        # strip leading/trailing underscores and limit length
+        return sanitize_filename_part(name).strip('_')[:50]
+
+    @cached_property
+    def _existing_name_index(self) -> tuple:
+        """(names, word set per name, word -> name indices) for fuzzy duplicate checks."""
+        # Names are already lowercased; tokenize each one once here
+        names = list(self.existing_media_names)
+        word_sets = [frozenset(name.split()) for name in names]
+        word_index = defaultdict(list)
+        for i, words in enumerate(word_sets):
+            for word in words:
+                word_index[word].append(i)
+        return names, word_sets, word_index
+
+    @cached_property
+    def _categories(self) -> List[str]:
+        """Category of each medium, for get_statistics."""
+        return [self._infer_category(medium) for medium in self.media]
 
     def _check_duplicate(self, medium: Dict) -> bool:
         """
         Check if medium already exists in knowledge base (cached version).
 
+        Fuzzy (Jaccard) scoring only runs against existing names that share
+        at least one word with this medium, found via an inverted index;
+        names sharing no words have similarity 0 and cannot match.
+
         Args:
             medium: MediaDB media dictionary
 
@@ -511,38 +698,27 @@ class MediaDBImporter:
             return True
 
         # Fuzzy matching (>90% similarity)
-        for existing_name in self.existing_media_names:
-            similarity = self._name_similarity(name, existing_name)
+        names, word_sets, word_index = self._existing_name_index
+        words = frozenset(name.split())
+        candidates = set()
+        for word in words:
+            candidates.update(word_index.get(word, ()))
+
+        size = len(words)
+        for i in candidates:
+            other_size = len(word_sets[i])
+            # Jaccard > 0.9 needs min/max word count > 0.9; skip the
+            # intersection for pairs whose sizes already rule that out
+            if min(size, other_size) * 10 < 9 * max(size, other_size):
+                continue
+            shared = len(words & word_sets[i])
+            similarity = shared / (size + other_size - shared)
             if similarity > 0.9:
-                logger.debug(f"Similar media found: {name} ≈ {existing_name} ({similarity:.2%})")
+                logger.debug(f"Similar media found: {name} ≈ {names[i]} ({similarity:.2%})")
                 return True
 
         return False
 
-    def _name_similarity(self, name1: str, name2: str) -> float:
-        """
-        Calculate similarity between two names using Jaccard index.
-
-        Args:
-            name1: First name
-            name2: Second name
-
-        Returns:
-            Similarity score (0-1)
-        """
-        # Convert to sets of words
-        words1 = set(name1.lower().split())
-        words2 = set(name2.lower().split())
-
-        # Jaccard index
-        intersection = words1 & words2
-        union = words1 | words2
-
-        if not union:
-            return 0.0
-
-        return len(intersection) / len(union)
-
     def get_statistics(self) -> Dict:
         """Get statistics about MediaDB import."""
         stats = {
@@ -553,8 +729,7 @@ class MediaDBImporter:
         }
 
         # Count by category
-        for medium in self.media:
-            category = self._infer_category(medium)
+        for category in self._categories:
             stats['media_by_category'][category] = stats['media_by_category'].get(category, 0) + 1
 
         # All MediaDB media are DEFINED
@@ -587,6 +762,11 @@ def main():
         type=int,
         help="Limit number of media to import"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
     parser.add_argument(
         "--stats",
         action="store_true",
@@ -622,9 +802,11 @@ def main():
     if args.stats:
         stats = importer.get_statistics()
         print("\nMediaDB Import Statistics:")
-        print(json.dumps(stats, indent=2))
+        print(dumps_json(stats, indent=True))
     else:
-        importer.import_all(limit=args.limit)
+        # Consume lazily so files are written as workers finish rendering
+        for _ in importer.iter_import_all(limit=args.limit, workers=args.workers):
+            pass
 
 
 if __name__ == "__main__":
@@ -20,16 +20,104 @@ Integration with cmm-ai-automation:
 - Extends with CultureMech-specific fields
 """
 
-import json
-import yaml
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Optional
 from datetime import datetime
 import logging
 
+from culturemech.utils.filename_utils import sanitize_filename_part
+from culturemech.utils.json_utils import dumps_json, load_json_file
+from culturemech.utils.parallel import map_in_order
+from culturemech.utils.yaml_utils import dump_recipe_yaml
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Supported output file formats (YAML for curation, JSON for machine consumers)
+OUTPUT_FORMATS = ("yaml", "json")
+
+
+def _read_json(path: str) -> tuple:
+    """Load a JSON file; returns (data, None) or (None, exception)."""
+    try:
+        return load_json_file(path), None
+    except Exception as e:
+        return None, e
+
+
+# Threads used to read composition files
+_COMPOSITION_READ_THREADS = 8
+
+# Category keyword patterns (matched against lowercased names, in this order)
+_FUNGAL_RE = re.compile(r'yeast|malt|potato dextrose|sabouraud|czapek')
+_ARCHAEA_RE = re.compile(r'halophil|methanogen|thermophil')
+_SPECIALIZED_RE = re.compile(r'anaerobic|marine|extreme|photo')
+
+# Solvent compounds skipped in API recipes (implicit in concentrations)
+_SOLVENT_NAMES = frozenset(["water", "distilled water", "deionized water", "h2o"])
+
+# PDF-parsed composition units -> CultureMech unit enums
+_COMPOSITION_UNIT_MAP = {
+    "g/L": "G_PER_L",
+    "mg/L": "MG_PER_L",
+    "ml/L": "ML_PER_L",
+    "µg/L": "UG_PER_L",
+    "μg/L": "UG_PER_L",  # Alternative unicode
+    "mM": "MM",
+    "µM": "UM",
+    "μM": "UM",
+    "%": "PERCENT",
+    "g": "G_PER_L",  # Assume per liter
+    "mg": "MG_PER_L",
+    "ml": "ML_PER_L",
+    "µg": "UG_PER_L",
+    "μg": "UG_PER_L",
+}
+
+# API recipe units -> CultureMech unit enums
+_API_UNIT_MAP = {
+    "g": "G_PER_L",
+    "g/L": "G_PER_L",
+    "mg": "MG_PER_L",
+    "mg/L": "MG_PER_L",
+    "µg": "MICROG_PER_L",
+    "µg/L": "MICROG_PER_L",
+    "μg": "MICROG_PER_L",
+    "μg/L": "MICROG_PER_L",
+    "mM": "MILLIMOLAR",
+    "µM": "MICROMOLAR",
+    "μM": "MICROMOLAR",
+    "%": "PERCENT_W_V",
+    "% (w/v)": "PERCENT_W_V",
+    "% (v/v)": "PERCENT_V_V",
+}
+
+# Preparation step keywords per action, matched against lowercased step text
+# (order matters - more specific first; the first action that matches wins)
+_ACTION_PATTERNS = (
+    ("AUTOCLAVE", re.compile(r'autoclave|steam steril')),
+    ("FILTER_STERILIZE", re.compile(r'filter|0\.22|0\.45|membrane')),
+    ("ADJUST_PH", re.compile(r'adjust ph|ph to|raise ph|lower ph')),
+    ("POUR_PLATES", re.compile(r'pour plate|petri dish|dispense')),
+    ("ADD_AGAR", re.compile(r'add agar|agar for solid')),
+    ("DISSOLVE", re.compile(r'dissolve|suspend')),
+    ("HEAT", re.compile(r'heat|warm|boil|°c|degrees')),
+    ("COOL", re.compile(r'cool|chill|ice')),
+    ("STORE", re.compile(r'store|storage|refrigerat|freeze')),
+    ("ALIQUOT", re.compile(r'aliquot|divide|portion')),
+    ("MIX", re.compile(r'mix|stir|shake|agitat')),
+)
+
 
 class MediaDiveImporter:
     """Import MediaDive data into CultureMech format."""
@@ -39,7 +127,8 @@ class MediaDiveImporter:
         mediadive_data_dir: Path,
         output_dir: Path,
         curator: str = "mediadive-import",
-        composition_dir: Optional[Path] = None
+        composition_dir: Optional[Path] = None,
+        output_format: str = "yaml",
     ):
         """
         Initialize importer.
@@ -49,16 +138,31 @@ class MediaDiveImporter:
             output_dir: Output directory for CultureMech YAML files
             curator: Curator name for curation history
             composition_dir: Optional directory containing composition JSON files
+            output_format: Output file format, "yaml" (default) or "json"
+
+        Raises:
+            ValueError: If output_format is not supported
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unsupported output format: {output_format} "
+                f"(expected one of {', '.join(OUTPUT_FORMATS)})"
+            )
+
         self.mediadive_dir = Path(mediadive_data_dir)
         self.output_dir = Path(output_dir)
         self.curator = curator
         self.composition_dir = Path(composition_dir) if composition_dir else None
+        self.output_format = output_format
 
         # Track filenames to detect duplicates
-        self.generated_filenames = {}  # {filename: [medium_id1, medium_id2, ...]}
+        self._first_ids: dict[str, str] = {}  # {filename: first medium identifier}
+        self._collisions: dict[str, list[str]] = {}  # {filename: [all identifiers]}, collisions only
         self.duplicate_count = 0
 
+        # Curation timestamp shared by all media in one import_all run
+        self._import_timestamp: Optional[str] = None
+
         # Load data
         self.media = self._load_json("mediadive_media.json")
         self.ingredients = self._load_json("mediadive_ingredients.json")
@@ -94,45 +198,81 @@ class MediaDiveImporter:
     def _load_json(self, filename: str) -> dict:
         """Load MediaDive JSON file."""
         path = self.mediadive_dir / filename
-        with open(path) as f:
-            return json.load(f)
+        return load_json_file(path)
 
     def _load_compositions(self):
         """Load all composition JSON files from composition directory."""
         if not self.composition_dir:
             return
 
-        for comp_file in self.composition_dir.glob("*.json"):
-            try:
-                with open(comp_file) as f:
-                    comp_data = json.load(f)
+        paths = [
+            entry.path
+            for entry in os.scandir(self.composition_dir)
+            if entry.name.endswith(".json")
+        ]
+
+        # Read and parse files on a few threads to overlap file I/O; results
+        # come back in directory order, so later files still win
+        with ThreadPoolExecutor(max_workers=_COMPOSITION_READ_THREADS) as executor:
+            for comp_file, (comp_data, error) in zip(paths, executor.map(_read_json, paths)):
+                try:
+                    if error:
+                        raise error
                     medium_id = comp_data.get("medium_id")
                     if medium_id:
                         self.compositions[medium_id] = comp_data
-            except Exception as e:
-                logger.warning(f"Could not load composition file {comp_file}: {e}")
+                except Exception as e:
+                    logger.warning(f"Could not load composition file {comp_file}: {e}")
 
-    def import_all(self, limit: Optional[int] = None) -> list[Path]:
+    def import_all(
+        self,
+        limit: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> list[Path]:
         """
         Import all MediaDive recipes to CultureMech format.
 
+        Conversion and serialization are spread across a process pool;
+        duplicate tracking and file writes happen here in input order, so
+        the last medium mapped to a filename still wins.
+
         Args:
             limit: Optionally limit number of recipes to import (for testing)
+            workers: Number of worker processes (default: CPU count; 1 = serial)
 
         Returns:
             List of generated YAML file paths
         """
         generated = []
         media_list = self.media["data"][:limit] if limit else self.media["data"]
-
-        for medium in media_list:
-            try:
-                yaml_path = self.import_medium(medium)
-                if yaml_path:
-                    generated.append(yaml_path)
+        self._import_timestamp = datetime.utcnow().isoformat() + "Z"
+
+        # Load the API index here so workers inherit it instead of each
+        # loading the file on first lookup
+        self._ensure_api_cache()
+
+        results = list(map_in_order(
+            self._render_medium, media_list, workers=workers, chunksize=64
+        ))
+
+        # Create each output category directory once rather than per file
+        for category in {rendered[0] for rendered, _ in results if rendered}:
+            (self.output_dir / category).mkdir(parents=True, exist_ok=True)
+
+        log_imports = logger.isEnabledFor(logging.INFO)
+        for medium, (rendered, error) in zip(media_list, results):
+            yaml_path = None
+            if rendered and not error:
+                try:
+                    yaml_path = self._store_rendered(medium, *rendered)
+                except Exception as e:
+                    error = str(e)
+            if error:
+                logger.error(f"✗ Error importing {medium.get('name', 'Unknown')}: {error}")
+            elif yaml_path:
+                generated.append(yaml_path)
+                if log_imports:
                     logger.info(f"✓ Imported {yaml_path.name}")
-            except Exception as e:
-                logger.error(f"✗ Error importing {medium.get('name', 'Unknown')}: {e}")
 
         logger.info(f"\n✓ Imported {len(generated)}/{len(media_list)} recipes")
 
@@ -152,12 +292,7 @@ class MediaDiveImporter:
             logger.info("✓ No duplicate filenames detected - all files are unique")
             return
 
-        # Find all duplicates
-        duplicates = {
-            fname: ids
-            for fname, ids in self.generated_filenames.items()
-            if len(ids) > 1
-        }
+        duplicates = self._collisions
 
         logger.warning(f"\n⚠️  DUPLICATE FILENAME SUMMARY")
         logger.warning(f"═══════════════════════════════════════════════════════")
@@ -194,6 +329,23 @@ class MediaDiveImporter:
         Original name "VY/2, REDUCED MEDIUM" is preserved in the 'original_name'
         field within the YAML file.
         """
+        rendered = self._render_medium(medium)
+        if not rendered:
+            return None
+        (self.output_dir / rendered[0]).mkdir(parents=True, exist_ok=True)
+        return self._store_rendered(medium, *rendered)
+
+    def _render_medium(self, medium: dict) -> Optional[tuple]:
+        """
+        Convert and serialize a medium without touching the output tree.
+
+        Args:
+            medium: MediaDive medium dictionary
+
+        Returns:
+            (category, filename, recipe name, UTF-8 YAML/JSON bytes), or None
+            if the medium cannot be converted
+        """
         recipe = self._convert_to_culturemech(medium)
 
         if not recipe:
@@ -209,41 +361,75 @@ class MediaDiveImporter:
         clean_name = self._sanitize_filename(name)
 
         # Include source and ID for uniqueness
-        filename = f"{source}_{medium_id}_{clean_name}.yaml"
+        filename = f"{source}_{medium_id}_{clean_name}.{self.output_format}"
 
         # Determine category
         category = self._infer_category(medium)
+
+        # Serialize and encode in memory so the file is written in a single
+        # call (in import_all, this runs in the worker processes)
+        if self.output_format == "json":
+            text = dumps_json(recipe, indent=True) + "\n"
+        else:
+            text = dump_recipe_yaml(recipe)
+        return category, filename, name, text.encode('utf-8')
+
+    def _store_rendered(
+        self,
+        medium: dict,
+        category: str,
+        filename: str,
+        name: str,
+        data: bytes,
+    ) -> Path:
+        """
+        Record a rendered medium's filename and write its YAML file.
+
+        The category directory must already exist.
+
+        Args:
+            medium: MediaDive medium dictionary
+            category: Output category directory
+            filename: Sanitized YAML filename
+            name: Recipe name (for duplicate warnings)
+            data: Serialized YAML (UTF-8)
+
+        Returns:
+            Path to generated YAML file
+        """
+        medium_id = medium.get('id', 'unknown')
+        source = medium.get('source', 'unknown')
         output_path = self.output_dir / category / filename
-        output_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Check for duplicate filenames
         full_filename = f"{category}/{filename}"
         medium_identifier = f"{source}:{medium_id}"
 
-        if full_filename in self.generated_filenames:
+        first_id = self._first_ids.get(full_filename)
+        if first_id is None:
+            # First time seeing this filename
+            self._first_ids[full_filename] = medium_identifier
+        else:
             # Duplicate detected!
             self.duplicate_count += 1
-            existing_ids = self.generated_filenames[full_filename]
-            logger.warning(
-                f"⚠️  DUPLICATE FILENAME: {filename}\n"
-                f"   Category: {category}\n"
-                f"   Current medium: {medium_identifier} ('{name}')\n"
-                f"   Previous medium(s): {', '.join(existing_ids)}\n"
-                f"   File will be OVERWRITTEN!"
-            )
+            existing_ids = self._collisions.setdefault(full_filename, [first_id])
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    f"⚠️  DUPLICATE FILENAME: {filename}\n"
+                    f"   Category: {category}\n"
+                    f"   Current medium: {medium_identifier} ('{name}')\n"
+                    f"   Previous medium(s): {', '.join(existing_ids)}\n"
+                    f"   File will be OVERWRITTEN!"
+                )
             # Add to list of media with this filename
-            self.generated_filenames[full_filename].append(medium_identifier)
-        else:
-            # First time seeing this filename
-            self.generated_filenames[full_filename] = [medium_identifier]
+            existing_ids.append(medium_identifier)
 
-        # Check if file already exists on disk (not from this run)
-        if output_path.exists():
+        # Check if file already exists on disk (not from this run); skip the
+        # stat call when the debug message would be dropped anyway
+        if logger.isEnabledFor(logging.DEBUG) and output_path.exists():
             logger.debug(f"Overwriting existing file: {filename}")
 
-        # Write YAML
-        with open(output_path, 'w') as f:
-            yaml.dump(recipe, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        output_path.write_bytes(data)
 
         return output_path
 
@@ -312,9 +498,12 @@ class MediaDiveImporter:
         if notes_parts:
             recipe["notes"] = " | ".join(notes_parts)
 
+        # API-fetched record, shared by the ingredient and preparation parsers
+        api_medium = self._lookup_api_medium(str(medium.get('id')))
+
         # Ingredients - try to load from composition data
         medium_id = f"medium_{medium.get('id')}"
-        composition_ingredients = self._parse_composition_ingredients(medium_id)
+        composition_ingredients = self._parse_composition_ingredients(medium_id, api_medium)
 
         if composition_ingredients:
             # Use actual composition data
@@ -334,7 +523,7 @@ class MediaDiveImporter:
             ]
 
         # Preparation steps - try to load from API data
-        prep_steps = self._parse_preparation_steps(str(medium.get('id')))
+        prep_steps = self._extract_prep_steps(api_medium)
         if prep_steps:
             recipe["preparation_steps"] = prep_steps
             logger.debug(f"Loaded {len(prep_steps)} preparation steps for medium {medium.get('id')}")
@@ -355,7 +544,7 @@ class MediaDiveImporter:
         # Curation history
         recipe["curation_history"] = [
             {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "timestamp": self._import_timestamp or datetime.utcnow().isoformat() + "Z",
                 "curator": self.curator,
                 "action": "Imported from MediaDive",
                 "notes": f"Source: {medium.get('source', 'MediaDive')}, ID: {medium.get('id')}"
@@ -364,7 +553,11 @@ class MediaDiveImporter:
 
         return recipe
 
-    def _parse_composition_ingredients(self, medium_id: str) -> Optional[list]:
+    def _parse_composition_ingredients(
+        self,
+        medium_id: str,
+        api_medium: Optional[dict] = None,
+    ) -> Optional[list]:
         """
         Parse composition data into CultureMech ingredient format.
 
@@ -374,6 +567,7 @@ class MediaDiveImporter:
 
         Args:
             medium_id: Medium ID to look up composition (e.g., "medium_1", "dsmz_1")
+            api_medium: API record for the medium, if already looked up
 
         Returns:
             List of IngredientDescriptor dicts, or None if no composition found
@@ -382,7 +576,9 @@ class MediaDiveImporter:
         numeric_id = medium_id.replace('medium_', '')
 
         # Try API data first (higher priority - more complete)
-        api_ingredients = self._parse_api_composition(numeric_id)
+        if api_medium is None:
+            api_medium = self._lookup_api_medium(numeric_id)
+        api_ingredients = self._extract_api_ingredients(api_medium)
         if api_ingredients:
             return api_ingredients
 
@@ -404,8 +600,10 @@ class MediaDiveImporter:
                 continue
 
             # Skip conditional ingredients like "if necessary"
-            if "if necessary" in ingredient_name.lower():
+            ingredient_key = ingredient_name.lower()
+            if "if necessary" in ingredient_key:
                 ingredient_name = ingredient_name.replace(", if necessary", "").replace(" if necessary", "").strip()
+                ingredient_key = ingredient_name.lower()
 
             # Build ingredient descriptor
             ing_desc = {
@@ -413,7 +611,7 @@ class MediaDiveImporter:
             }
 
             # Look up ChEBI ID from ingredients database
-            ing_data = self.ingredients_by_name.get(ingredient_name.lower())
+            ing_data = self.ingredients_by_name.get(ingredient_key)
             if ing_data and ing_data.get("ChEBI"):
                 ing_desc["term"] = {
                     "id": f"CHEBI:{ing_data['ChEBI']}",
@@ -430,23 +628,7 @@ class MediaDiveImporter:
                 unit = comp_item["unit"]
 
                 # Map unit to CultureMech enums
-                unit_map = {
-                    "g/L": "G_PER_L",
-                    "mg/L": "MG_PER_L",
-                    "ml/L": "ML_PER_L",
-                    "µg/L": "UG_PER_L",
-                    "μg/L": "UG_PER_L",  # Alternative unicode
-                    "mM": "MM",
-                    "µM": "UM",
-                    "μM": "UM",
-                    "%": "PERCENT",
-                    "g": "G_PER_L",  # Assume per liter
-                    "mg": "MG_PER_L",
-                    "ml": "ML_PER_L",
-                    "µg": "UG_PER_L",
-                    "μg": "UG_PER_L",
-                }
-                standard_unit = unit_map.get(unit, "G_PER_L")
+                standard_unit = _COMPOSITION_UNIT_MAP.get(unit, "G_PER_L")
 
                 ing_desc["concentration"] = {
                     "value": conc_value,
@@ -461,9 +643,68 @@ class MediaDiveImporter:
 
         return ingredients if ingredients else None
 
-    def _parse_api_composition(self, medium_id: str) -> Optional[list]:
+    def _ensure_api_cache(self) -> Optional[dict]:
+        """
+        Load API-fetched media once and index them by medium ID.
+
+        Returns:
+            Dict mapping str(medium ID) to its API record, or None if the
+            API data file is missing or could not be loaded
+        """
+        # Load API data once (cache it for performance); a missing or
+        # unreadable file is cached as None so later calls return at once
+        if not hasattr(self, '_api_data_by_id'):
+            # API data file lives in a sibling directory to mediadive_dir
+            api_data_file = self.mediadive_dir.parent / "mediadive_api" / "mediadive_api_media.json"
+            if not api_data_file.exists():
+                self._api_data_by_id = None
+                return None
+
+            try:
+                # API data has medium.id directly; the first record for an ID wins
+                api_data_by_id = {}
+                for medium in self._iter_api_media(api_data_file):
+                    api_data_by_id.setdefault(str(medium.get("medium", {}).get("id")), medium)
+                self._api_data_by_id = api_data_by_id
+            except Exception as e:
+                logger.warning(f"Could not load API data file: {e}")
+                self._api_data_by_id = None
+                return None
+
+        return self._api_data_by_id or None
+
+    def _iter_api_media(self, api_data_file: Path):
+        """
+        Yield medium records from the API data file.
+
+        Records are streamed from the ``data`` array with ijson when it is
+        installed, so only the by-ID index is kept rather than the whole
+        document; otherwise the file is loaded in one go.
+        """
+        if HAS_IJSON:
+            with open(api_data_file, 'rb') as f:
+                yield from ijson.items(f, 'data.item', use_float=True)
+        else:
+            yield from (load_json_file(api_data_file) or {}).get("data", [])
+
+    def _lookup_api_medium(self, medium_id: str) -> Optional[dict]:
+        """
+        Find a medium's API-fetched record.
+
+        Args:
+            medium_id: Medium ID (e.g., "1", "2a")
+
+        Returns:
+            API record for the medium, or None if there is none
+        """
+        api_data_by_id = self._ensure_api_cache()
+        if not api_data_by_id:
+            return None
+        return api_data_by_id.get(str(medium_id))
+
+    def _extract_api_ingredients(self, medium_data: Optional[dict]) -> Optional[list]:
         """
-        Parse composition from API-fetched data.
+        Parse composition from an API-fetched medium record.
 
         API structure:
         {
@@ -487,37 +728,11 @@ class MediaDiveImporter:
         }
 
         Args:
-            medium_id: Medium ID (e.g., "1", "2a")
+            medium_data: API record from _lookup_api_medium (may be None)
 
         Returns:
             List of ingredient dictionaries in CultureMech format
         """
-        # Check if API data file exists (sibling directory to mediadive_dir)
-        api_data_file = self.mediadive_dir.parent / "mediadive_api" / "mediadive_api_media.json"
-        if not api_data_file.exists():
-            return None
-
-        # Load API data (cache it for performance)
-        if not hasattr(self, '_api_data_cache'):
-            try:
-                with open(api_data_file) as f:
-                    self._api_data_cache = json.load(f)
-            except Exception as e:
-                logger.warning(f"Could not load API data file: {e}")
-                self._api_data_cache = None
-                return None
-
-        if not self._api_data_cache:
-            return None
-
-        # Find medium by ID
-        medium_data = None
-        for medium in self._api_data_cache.get("data", []):
-            # API data has medium.id directly
-            if str(medium.get("medium", {}).get("id")) == str(medium_id):
-                medium_data = medium
-                break
-
         if not medium_data:
             return None
 
@@ -530,9 +745,10 @@ class MediaDiveImporter:
                     continue
 
                 compound_name = item.get("compound", "")
+                compound_key = compound_name.lower()
 
                 # Skip solvents (water, distilled water) - these are implicit in concentrations
-                if compound_name.lower() in ["water", "distilled water", "deionized water", "h2o"]:
+                if compound_key in _SOLVENT_NAMES:
                     continue
 
                 # Build ingredient descriptor
@@ -541,7 +757,7 @@ class MediaDiveImporter:
                 }
 
                 # Look up ChEBI ID via ingredients database
-                ing_data = self.ingredients_by_name.get(compound_name.lower())
+                ing_data = self.ingredients_by_name.get(compound_key)
                 if ing_data and ing_data.get("ChEBI"):
                     ingredient["term"] = {
                         "id": f"CHEBI:{ing_data['ChEBI']}",
@@ -587,27 +803,11 @@ class MediaDiveImporter:
         Returns:
             Normalized unit enum value
         """
-        unit_map = {
-            "g": "G_PER_L",
-            "g/L": "G_PER_L",
-            "mg": "MG_PER_L",
-            "mg/L": "MG_PER_L",
-            "µg": "MICROG_PER_L",
-            "µg/L": "MICROG_PER_L",
-            "μg": "MICROG_PER_L",
-            "μg/L": "MICROG_PER_L",
-            "mM": "MILLIMOLAR",
-            "µM": "MICROMOLAR",
-            "μM": "MICROMOLAR",
-            "%": "PERCENT_W_V",
-            "% (w/v)": "PERCENT_W_V",
-            "% (v/v)": "PERCENT_V_V",
-        }
-        return unit_map.get(unit, "G_PER_L")
+        return _API_UNIT_MAP.get(unit, "G_PER_L")
 
-    def _parse_preparation_steps(self, medium_id: str) -> Optional[list]:
+    def _extract_prep_steps(self, medium_data: Optional[dict]) -> Optional[list]:
         """
-        Parse preparation steps from API-fetched data.
+        Parse preparation steps from an API-fetched medium record.
 
         API structure:
         {
@@ -622,36 +822,11 @@ class MediaDiveImporter:
         }
 
         Args:
-            medium_id: Medium ID (e.g., "1", "2a")
+            medium_data: API record from _lookup_api_medium (may be None)
 
         Returns:
             List of PreparationStep dictionaries
         """
-        # Check if API data file exists
-        api_data_file = self.mediadive_dir.parent / "mediadive_api" / "mediadive_api_media.json"
-        if not api_data_file.exists():
-            return None
-
-        # Load API data (use cache if available)
-        if not hasattr(self, '_api_data_cache'):
-            try:
-                with open(api_data_file) as f:
-                    self._api_data_cache = json.load(f)
-            except Exception as e:
-                logger.warning(f"Could not load API data file: {e}")
-                self._api_data_cache = None
-                return None
-
-        if not self._api_data_cache:
-            return None
-
-        # Find medium by ID
-        medium_data = None
-        for medium in self._api_data_cache.get("data", []):
-            if str(medium.get("medium", {}).get("id")) == str(medium_id):
-                medium_data = medium
-                break
-
         if not medium_data:
             return None
 
@@ -693,32 +868,13 @@ class MediaDiveImporter:
         """
         step_lower = step_text.lower()
 
-        # Action classification rules (order matters - more specific first)
-        if any(kw in step_lower for kw in ["autoclave", "steam steril"]):
-            return "AUTOCLAVE"
-        elif any(kw in step_lower for kw in ["filter", "0.22", "0.45", "membrane"]):
-            return "FILTER_STERILIZE"
-        elif any(kw in step_lower for kw in ["adjust ph", "ph to", "raise ph", "lower ph"]):
-            return "ADJUST_PH"
-        elif any(kw in step_lower for kw in ["pour plate", "petri dish", "dispense"]):
-            return "POUR_PLATES"
-        elif any(kw in step_lower for kw in ["add agar", "agar for solid"]):
-            return "ADD_AGAR"
-        elif any(kw in step_lower for kw in ["dissolve", "suspend"]):
-            return "DISSOLVE"
-        elif any(kw in step_lower for kw in ["heat", "warm", "boil", "°c", "degrees"]):
-            return "HEAT"
-        elif any(kw in step_lower for kw in ["cool", "chill", "ice"]):
-            return "COOL"
-        elif any(kw in step_lower for kw in ["store", "storage", "refrigerat", "freeze"]):
-            return "STORE"
-        elif any(kw in step_lower for kw in ["aliquot", "divide", "portion"]):
-            return "ALIQUOT"
-        elif any(kw in step_lower for kw in ["mix", "stir", "shake", "agitat"]):
-            return "MIX"
-        else:
-            # Default to MIX for unclassified steps
-            return "MIX"
+        # First action (in priority order) with a keyword anywhere in the step
+        for action, pattern in _ACTION_PATTERNS:
+            if pattern.search(step_lower):
+                return action
+
+        # Default to MIX for unclassified steps
+        return "MIX"
 
     def _sanitize_filename(self, name: str) -> str:
         """
@@ -789,22 +945,9 @@ class MediaDiveImporter:
         Returns:
             Sanitized filename-safe string (no extension)
         """
-        # Replace ALL non-alphanumeric except dash and dot with underscore
-        clean_name = ''
-        for char in name:
-            if char.isalnum() or char in ['-', '.']:
-                clean_name += char
-            else:
-                clean_name += '_'
-
-        # Collapse multiple consecutive underscores
-        while '__' in clean_name:
-            clean_name = clean_name.replace('__', '_')
-
-        # Remove leading/trailing underscores
-        clean_name = clean_name.strip('_')
-
-        return clean_name
+        # Replace each run of non-alphanumeric characters (except dash and
+        # dot) with a single underscore, then remove leading/trailing ones
+        return sanitize_filename_part(name).strip('_')
 
     def _infer_category(self, medium: dict) -> str:
         """
@@ -815,15 +958,15 @@ class MediaDiveImporter:
         name = medium.get("name", "").lower()
 
         # Fungal media keywords
-        if any(kw in name for kw in ["yeast", "malt", "potato dextrose", "sabouraud", "czapek"]):
+        if _FUNGAL_RE.search(name):
             return "fungal"
 
         # Archaeal media keywords
-        if any(kw in name for kw in ["halophil", "methanogen", "thermophil"]):
+        if _ARCHAEA_RE.search(name):
             return "archaea"
 
         # Specialized media keywords
-        if any(kw in name for kw in ["anaerobic", "marine", "extreme", "photo"]):
+        if _SPECIALIZED_RE.search(name):
             return "specialized"
 
         # Default to bacterial
@@ -831,24 +974,27 @@ class MediaDiveImporter:
 
     def get_statistics(self) -> dict:
         """Get statistics about MediaDive data."""
-        stats = {
+        # Count by type and source in a single pass
+        defined = complex_media = 0
+        sources = Counter()
+        for medium in self.media["data"]:
+            if medium.get("complex_medium"):
+                complex_media += 1
+            else:
+                defined += 1
+            sources[medium.get("source", "Unknown")] += 1
+
+        return {
             "total_media": self.media["count"],
             "total_ingredients": self.ingredients["count"],
             "total_solutions": self.solutions["count"],
             "media_by_type": {
-                "defined": sum(1 for m in self.media["data"] if not m.get("complex_medium")),
-                "complex": sum(1 for m in self.media["data"] if m.get("complex_medium"))
+                "defined": defined,
+                "complex": complex_media
             },
-            "media_by_source": {}
+            "media_by_source": dict(sources)
         }
 
-        # Count by source
-        for medium in self.media["data"]:
-            source = medium.get("source", "Unknown")
-            stats["media_by_source"][source] = stats["media_by_source"].get(source, 0) + 1
-
-        return stats
-
 
 def main():
     """CLI entry point."""
@@ -879,6 +1025,17 @@ def main():
         type=int,
         help="Limit number of recipes to import (for testing)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="yaml",
+        help="Output file format (default: yaml)"
+    )
     parser.add_argument(
         "--stats",
         action="store_true",
@@ -890,17 +1047,18 @@ def main():
     importer = MediaDiveImporter(
         mediadive_data_dir=args.input,
         output_dir=args.output,
-        composition_dir=args.compositions
+        composition_dir=args.compositions,
+        output_format=args.format,
     )
 
     if args.stats:
         stats = importer.get_statistics()
         print("\nMediaDive Statistics:")
-        print(json.dumps(stats, indent=2))
+        print(dumps_json(stats, indent=True))
         return
 
     # Import recipes
-    generated = importer.import_all(limit=args.limit)
+    generated = importer.import_all(limit=args.limit, workers=args.workers)
 
     print(f"\n✓ Successfully imported {len(generated)} recipes")
     print(f"  Output directory: {args.output}")
@@ -12,17 +12,51 @@ Integration Strategy:
 - ~200 new unique recipes expected
 """
 
-import json
-import yaml
 import re
+from collections import Counter
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from datetime import datetime
+from itertools import islice
 import logging
 
+from culturemech.utils.json_utils import dumps_json, load_json_file
+from culturemech.utils.parallel import map_in_order
+from culturemech.utils.yaml_utils import dump_recipe_yaml
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Supported output file formats (YAML for curation, JSON for machine consumers)
+OUTPUT_FORMATS = ("yaml", "json")
+
+# Media number cleanup ("No. 802" -> "802") and recipe ID/filename sanitizing
+_NON_DIGIT_RE = re.compile(r"[^\d]")
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9]")
+_NON_FILENAME_RE = re.compile(r"[^A-Z0-9_]")
+
+# Keyword patterns (matched against lowercased media names)
+_COMPLEX_NAME_RE = re.compile(r"agar|broth|extract|peptone|yeast")
+_COMPLEX_ING_RE = re.compile(r"yeast extract|peptone|beef extract|malt")
+_FUNGAL_RE = re.compile(r"fungi|fungal|yeast|mold|mould")
+_ARCHAEAL_RE = re.compile(r"archaea|archaeal")
+_MARINE_RE = re.compile(r"marine|seawater")
+
+# NBRC ingredient units (lowercased) to CultureMech concentration units
+_UNIT_MAP = {
+    "g": "G_PER_L",
+    "mg": "MG_PER_L",
+    "ml": "ML_PER_L",
+    "μl": "UL_PER_L",
+    "μg": "UG_PER_L",
+}
+
 
 class NBRCImporter:
     """Import NBRC media data into CultureMech format."""
@@ -32,6 +66,7 @@ class NBRCImporter:
         raw_data_dir: Path,
         output_dir: Path,
         curator: str = "nbrc-import",
+        output_format: str = "yaml",
     ):
         """
         Initialize importer.
@@ -40,16 +75,40 @@ class NBRCImporter:
             raw_data_dir: Directory containing NBRC JSON files
             output_dir: Output directory for CultureMech YAML files
             curator: Curator name for provenance
+            output_format: Output file format, "yaml" (default) or "json"
+
+        Raises:
+            ValueError: If output_format is not supported
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unsupported output format: {output_format} "
+                f"(expected one of {', '.join(OUTPUT_FORMATS)})"
+            )
+
         self.raw_dir = Path(raw_data_dir)
         self.output_dir = Path(output_dir)
         self.curator = curator
+        self.output_format = output_format
+
+        # Timestamp shared by all records of one import run
+        self._import_timestamp: Optional[str] = None
 
-        # Load data
-        self.media = self._load_json("nbrc_media.json")
+        # Media are loaded on first use of self.media; import_all streams them
+        self._media: Optional[List[Dict]] = None
         self.stats = self._load_json("scrape_stats.json")
 
-        logger.info(f"Loaded {len(self.media)} NBRC media recipes")
+    @property
+    def media(self) -> List[Dict]:
+        """All NBRC media records (loaded on first access)."""
+        if self._media is None:
+            self._media = self._load_json("nbrc_media.json")
+            logger.info(f"Loaded {len(self._media)} NBRC media recipes")
+        return self._media
+
+    @media.setter
+    def media(self, media: List[Dict]):
+        self._media = media
 
     def _load_json(self, filename: str) -> Any:
         """Load JSON file from raw data directory."""
@@ -58,34 +117,69 @@ class NBRCImporter:
             logger.warning(f"File not found: {path}")
             return [] if "media" in filename else {}
 
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
+        return load_json_file(path)
+
+    def _iter_media(self):
+        """
+        Yield NBRC media records.
 
-    def import_all(self, limit: Optional[int] = None) -> List[Path]:
+        Records are streamed from nbrc_media.json with ijson when it is
+        installed, so an import with a limit only parses the records it
+        needs; otherwise (or if self.media is already loaded) the full list
+        is used.
+        """
+        path = self.raw_dir / "nbrc_media.json"
+        if self._media is not None or not HAS_IJSON or not path.exists():
+            yield from self.media
+            return
+
+        with open(path, "rb") as f:
+            yield from ijson.items(f, "item", use_float=True)
+
+    def import_all(
+        self, limit: Optional[int] = None, workers: Optional[int] = None
+    ) -> List[Path]:
         """
         Import all NBRC media to CultureMech format.
 
+        Conversion and serialization are spread across a process pool; files
+        are written here in input order, so the last medium mapped to a
+        filename still wins.
+
         Args:
             limit: Optional limit on number of media to import
+            workers: Number of worker processes (default: CPU count; 1 = serial)
 
         Returns:
             List of generated YAML file paths
         """
         generated = []
-        media_list = self.media[:limit] if limit else self.media
+        media_list = list(islice(self._iter_media(), limit or None))
+        self._import_timestamp = datetime.now().isoformat() + "Z"
 
         logger.info(f"\nImporting {len(media_list)} NBRC media recipes...")
 
-        for medium in media_list:
-            try:
-                yaml_path = self.import_medium(medium)
-                if yaml_path:
-                    generated.append(yaml_path)
-                    logger.info(f"✓ Imported {yaml_path.name}")
-            except Exception as e:
+        results = list(map_in_order(
+            self._render_medium, media_list, workers=workers, chunksize=32
+        ))
+
+        # Create each output category directory once rather than per file
+        for category_dir in {rendered[0].parent for rendered, _ in results if rendered}:
+            category_dir.mkdir(parents=True, exist_ok=True)
+
+        for medium, (rendered, error) in zip(media_list, results):
+            if not error:
+                try:
+                    yaml_path = self._write_rendered(*rendered)
+                except Exception as e:
+                    error = str(e)
+            if error:
                 logger.error(
-                    f"✗ Error importing {medium.get('media_name', 'Unknown')}: {e}"
+                    f"✗ Error importing {medium.get('media_name', 'Unknown')}: {error}"
                 )
+            else:
+                generated.append(yaml_path)
+                logger.info(f"✓ Imported {yaml_path.name}")
 
         logger.info(f"\n✓ Imported {len(generated)}/{len(media_list)} media")
         return generated
@@ -100,6 +194,20 @@ class NBRCImporter:
         Returns:
             Path to generated YAML file
         """
+        output_path, text = self._render_medium(medium)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return self._write_rendered(output_path, text)
+
+    def _render_medium(self, medium: Dict) -> tuple:
+        """
+        Convert a single NBRC medium to YAML/JSON text without writing it.
+
+        Args:
+            medium: NBRC media dictionary
+
+        Returns:
+            Tuple of (output path, serialized text)
+        """
         # Create CultureMech recipe
         recipe = {
             "name": medium.get("media_name", "Unknown"),
@@ -120,13 +228,18 @@ class NBRCImporter:
         # Determine output category
         category = self._determine_category(medium)
 
-        # Save to YAML
+        # Serialize in memory so the file can be written in a single call
         output_path = self._get_output_path(recipe, category)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.output_format == "json":
+            text = dumps_json(recipe, indent=True) + "\n"
+        else:
+            text = dump_recipe_yaml(recipe)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            yaml.dump(recipe, f, default_flow_style=False, sort_keys=False)
+        return output_path, text
 
+    def _write_rendered(self, output_path: Path, text: str) -> Path:
+        """Write rendered YAML text to its output path (whose directory must exist)."""
+        output_path.write_text(text, encoding="utf-8")
         return output_path
 
     def _create_recipe_id(self, medium: Dict) -> str:
@@ -134,14 +247,14 @@ class NBRCImporter:
         media_number = medium.get("media_number", "")
 
         # Clean media number (e.g., "No. 802" -> "802")
-        number = re.sub(r"[^\d]", "", media_number)
+        number = _NON_DIGIT_RE.sub("", media_number)
 
         if number:
             return f"NBRC_{number}"
         else:
             # Fallback: sanitize name
             name = medium.get("media_name", "UNKNOWN")
-            sanitized = re.sub(r"[^A-Z0-9]", "_", name.upper())
+            sanitized = _NON_ALNUM_RE.sub("_", name.upper())
             return f"NBRC_{sanitized[:30]}"
 
     def _create_description(self, medium: Dict) -> str:
@@ -177,16 +290,14 @@ class NBRCImporter:
         ingredients = medium.get("ingredients", [])
 
         # Check for complex media indicators
-        complex_terms = ["agar", "broth", "extract", "peptone", "yeast"]
-        if any(term in name for term in complex_terms):
+        if _COMPLEX_NAME_RE.search(name):
             return "COMPLEX"
 
-        # Check ingredients
-        complex_ingredients = ["yeast extract", "peptone", "beef extract", "malt"]
-        for ing in ingredients:
-            ing_name = ing.get("name", "").lower()
-            if any(term in ing_name for term in complex_ingredients):
-                return "COMPLEX"
+        # Check ingredients (one search over all names; keywords never span
+        # the newline separators)
+        ing_names = "\n".join(ing.get("name", "") for ing in ingredients).lower()
+        if _COMPLEX_ING_RE.search(ing_names):
+            return "COMPLEX"
 
         # If all ingredients have chemical formulas, likely defined
         has_formulas = any("(" in ing.get("name", "") for ing in ingredients)
@@ -238,14 +349,7 @@ class NBRCImporter:
 
             if quantity:
                 # Map units to standard format
-                unit_map = {
-                    "g": "G_PER_L",
-                    "mg": "MG_PER_L",
-                    "ml": "ML_PER_L",
-                    "μl": "UL_PER_L",
-                    "μg": "UG_PER_L",
-                }
-                standard_unit = unit_map.get(unit.lower(), "G_PER_L")
+                standard_unit = _UNIT_MAP.get(unit.lower(), "G_PER_L")
 
                 ingredient["concentration"] = {
                     "value": str(quantity),
@@ -310,13 +414,11 @@ class NBRCImporter:
         name = medium.get("media_name", "").lower()
 
         # Category keywords
-        if any(
-            term in name for term in ["fungi", "fungal", "yeast", "mold", "mould"]
-        ):
+        if _FUNGAL_RE.search(name):
             return "fungal"
-        elif any(term in name for term in ["archaea", "archaeal"]):
+        elif _ARCHAEAL_RE.search(name):
             return "archaeal"
-        elif any(term in name for term in ["marine", "seawater"]):
+        elif _MARINE_RE.search(name):
             return "marine"
         else:
             return "bacterial"  # Default
@@ -333,7 +435,7 @@ class NBRCImporter:
         """
         return [
             {
-                "timestamp": datetime.now().isoformat() + "Z",
+                "timestamp": self._import_timestamp or datetime.now().isoformat() + "Z",
                 "curator": self.curator,
                 "action": "Imported from NBRC",
                 "notes": (
@@ -357,8 +459,8 @@ class NBRCImporter:
         """
         # Create filename from media number (e.g., "YPG Medium" -> "NBRC_YPG_MEDIUM.yaml")
         name = recipe['name']
-        sanitized = re.sub(r'[^A-Z0-9_]', '_', name.upper())
-        filename = f"NBRC_{sanitized}.yaml"
+        sanitized = _NON_FILENAME_RE.sub('_', name.upper())
+        filename = f"NBRC_{sanitized}.{self.output_format}"
         return self.output_dir / category / filename
 
     def print_stats(self):
@@ -368,10 +470,7 @@ class NBRCImporter:
         logger.info(f"Total media: {len(self.media)}")
 
         # Count by category
-        categories = {}
-        for medium in self.media:
-            cat = self._determine_category(medium)
-            categories[cat] = categories.get(cat, 0) + 1
+        categories = Counter(map(self._determine_category, self.media))
 
         logger.info("\nBy category:")
         for cat, count in sorted(categories.items()):
@@ -400,18 +499,31 @@ def main():
     parser.add_argument(
         "-l", "--limit", type=int, help="Limit number of media to import"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="yaml",
+        help="Output file format (default: yaml)",
+    )
     parser.add_argument(
         "--stats", action="store_true", help="Print statistics only (no import)"
     )
 
     args = parser.parse_args()
 
-    importer = NBRCImporter(raw_data_dir=args.input, output_dir=args.output)
+    importer = NBRCImporter(
+        raw_data_dir=args.input, output_dir=args.output, output_format=args.format
+    )
 
     if args.stats:
         importer.print_stats()
     else:
-        importer.import_all(limit=args.limit)
+        importer.import_all(limit=args.limit, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -5,32 +5,97 @@ Converts SAG (Sammlung von Algenkulturen Göttingen) media recipes to CultureMec
 SAG provides ~30 algae media recipes, primarily in PDF format.
 """
 
-import argparse
-import json
+import os
 import re
-import yaml
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from culturemech.utils.json_utils import dumps_json, load_json_file
+from culturemech.utils.parallel import map_in_order
+from culturemech.utils.yaml_utils import dump_recipe_yaml
+
+# Supported output file formats (YAML for curation, JSON for machine consumers)
+OUTPUT_FORMATS = ('yaml', 'json')
+
+# Filename sanitizing: problematic characters, then runs of underscores/whitespace
+_UNSAFE_CHARS_RE = re.compile(r'[<>:"/\\|?*,;()%#&@!\[\]{}]')
+_UNDERSCORE_RUN_RE = re.compile(r'[_\s]+')
+
+# PDF text parsing
+_INGREDIENT_SECTION_RE = re.compile(r'(ingredient|component|composition|stock solution)', re.I)
+_INGREDIENT_RE = re.compile(r'([A-Z][a-z]?[A-Z0-9().·•]+)\s+([\d.]+\s*[a-zA-Z/]+)')
+_SECTION_END_RE = re.compile(r'(preparation|method|note|reference)', re.I)
+_PREPARATION_SECTION_RE = re.compile(r'(preparation|method|procedure|protocol)', re.I)
+
+# Salinity keywords (substrings of lowercased names/IDs) and known SAG media IDs
+_SALTWATER_RE = re.compile('|'.join(map(re.escape, [
+    'seawater', 'marine', 'f/2', 'f2', 'erdschreiber',
+    'ocean', 'saltwater', 'sw', 'swes'
+])))
+_SALTWATER_IDS = frozenset(['f/2', 'swes', 'diat', 'porph'])
+_FRESHWATER_RE = re.compile('|'.join(map(re.escape, [
+    'freshwater', 'bold', 'bg 11', 'bg11', 'bristol',
+    'tap', 'soil', 'chu', 'mbb+v', '3nbbm'
+])))
+_FRESHWATER_IDS = frozenset(['bg 11', 'b', '3nbbm+v', 'mbb+v'])
+
+# Maximum number of ingredients extracted from PDF text
+_MAX_INGREDIENTS = 20
+
+# Full names for abbreviated SAG media IDs
+_SAG_NAME_EXPANSIONS = {
+    'BG 11': 'BG-11 Medium',
+    'bg 11': 'BG-11 Medium',
+    '3NBBM+V': '3N Bold Basal Medium with Vitamins',
+    'f/2': 'f/2 Medium',
+    'B': 'Bold\'s Basal Medium',
+    'Diat': 'Diatom Medium',
+    'SWES': 'Seawater Enriched with Soil Extract',
+    'MBB+V': 'Modified Bold\'s Basal Medium with Vitamins',
+    'Spirul': 'Spirulina Medium',
+    'WC': 'Woods Hole MBL Medium',
+    'Porph': 'Porphyridium Medium',
+    'Pol': 'Polytoma Medium',
+    'Ochr': 'Ochromonas Medium',
+    'Chilo': 'Chilomonas Medium',
+}
+
 
 class SAGImporter:
     """Import SAG media data to CultureMech format."""
 
-    def __init__(self, raw_data_dir: Path, output_dir: Path):
+    def __init__(self, raw_data_dir: Path, output_dir: Path, output_format: str = 'yaml'):
         """Initialize importer.
 
         Args:
             raw_data_dir: Directory containing sag_media.json
             output_dir: Root normalized_yaml directory
+            output_format: Output file format, 'yaml' (default) or 'json'
+
+        Raises:
+            ValueError: If output_format is not supported
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unsupported output format: {output_format} "
+                f"(expected one of {', '.join(OUTPUT_FORMATS)})"
+            )
+
         self.raw_data_dir = Path(raw_data_dir)
         self.output_dir = Path(output_dir)
+        self.output_format = output_format
+
+        # Curation date shared by all recipes of one import run
+        self._import_date: Optional[str] = None
 
         # Create algae category directory
         self.algae_dir = self.output_dir / "algae"
         self.algae_dir.mkdir(parents=True, exist_ok=True)
 
+        # Output path prefix, so per-file paths are plain string concatenation
+        self._algae_prefix = os.fspath(self.algae_dir) + os.sep + "SAG_"
+
         self.stats = {
             "total": 0,
             "success": 0,
@@ -46,8 +111,7 @@ class SAGImporter:
             print(f"  Run: just fetch-sag")
             return []
 
-        with open(media_file) as f:
-            data = json.load(f)
+        data = load_json_file(media_file)
 
         recipes = data.get("recipes", [])
         if not recipes:
@@ -60,9 +124,9 @@ class SAGImporter:
     def _sanitize_filename(self, name: str) -> str:
         """Sanitize filename for filesystem compatibility."""
         # Replace problematic characters with underscore (including forward slash!)
-        safe = re.sub(r'[<>:"/\\|?*,;()%#&@!\[\]{}]', '_', name)
+        safe = _UNSAFE_CHARS_RE.sub('_', name)
         # Replace multiple underscores/spaces with single underscore
-        safe = re.sub(r'[_\\s]+', '_', safe)
+        safe = _UNDERSCORE_RUN_RE.sub('_', safe)
         # Remove leading/trailing underscores and dots
         safe = safe.strip('_.')
         # Ensure it's not empty
@@ -81,31 +145,19 @@ class SAGImporter:
         recipe_id = recipe.get('id', '').lower()
 
         # Saltwater indicators
-        saltwater_keywords = [
-            'seawater', 'marine', 'f/2', 'f2', 'erdschreiber',
-            'ocean', 'saltwater', 'sw', 'swes'
-        ]
-        if any(kw in name for kw in saltwater_keywords):
-            return 'saltwater'
-        if any(kw in recipe_id for kw in saltwater_keywords):
+        if _SALTWATER_RE.search(name) or _SALTWATER_RE.search(recipe_id):
             return 'saltwater'
 
         # SAG-specific saltwater media
-        saltwater_ids = ['f/2', 'swes', 'diat', 'porph']
-        if recipe_id in saltwater_ids:
+        if recipe_id in _SALTWATER_IDS:
             return 'saltwater'
 
         # Freshwater indicators
-        freshwater_keywords = [
-            'freshwater', 'bold', 'bg 11', 'bg11', 'bristol',
-            'tap', 'soil', 'chu', 'mbb+v', '3nbbm'
-        ]
-        if any(kw in name for kw in freshwater_keywords):
+        if _FRESHWATER_RE.search(name):
             return 'freshwater'
 
         # SAG-specific freshwater media
-        freshwater_ids = ['bg 11', 'b', '3nbbm+v', 'mbb+v']
-        if recipe_id in freshwater_ids:
+        if recipe_id in _FRESHWATER_IDS:
             return 'freshwater'
 
         # Default to freshwater
@@ -113,24 +165,7 @@ class SAGImporter:
 
     def _expand_sag_name(self, sag_id: str) -> str:
         """Expand SAG abbreviated names to full names."""
-        expansions = {
-            'BG 11': 'BG-11 Medium',
-            'bg 11': 'BG-11 Medium',
-            '3NBBM+V': '3N Bold Basal Medium with Vitamins',
-            'f/2': 'f/2 Medium',
-            'B': 'Bold\'s Basal Medium',
-            'Diat': 'Diatom Medium',
-            'SWES': 'Seawater Enriched with Soil Extract',
-            'MBB+V': 'Modified Bold\'s Basal Medium with Vitamins',
-            'Spirul': 'Spirulina Medium',
-            'WC': 'Woods Hole MBL Medium',
-            'Porph': 'Porphyridium Medium',
-            'Pol': 'Polytoma Medium',
-            'Ochr': 'Ochromonas Medium',
-            'Chilo': 'Chilomonas Medium',
-        }
-
-        return expansions.get(sag_id, sag_id)
+        return _SAG_NAME_EXPANSIONS.get(sag_id, sag_id)
 
     def convert_recipe(self, recipe: Dict) -> Dict[str, Any]:
         """Convert SAG recipe to CultureMech format."""
@@ -212,7 +247,7 @@ class SAGImporter:
         cm_recipe['curation_history'] = [
             {
                 'curator': 'sag-import',
-                'date': datetime.now(timezone.utc).strftime('%Y-%m-%d'),
+                'date': self._import_date or datetime.now(timezone.utc).strftime('%Y-%m-%d'),
                 'action': f'Imported from SAG Culture Collection',
                 'notes': f'Source ID: {sag_id}, PDF URL: {pdf_url}'
             }
@@ -233,53 +268,65 @@ class SAGImporter:
         """Try to extract ingredients from PDF text."""
         ingredients = []
 
-        # Look for common ingredient patterns
-        lines = text.split('\n')
-        in_ingredients_section = False
-
-        for line in lines:
-            # Look for section headers
-            if re.search(r'(ingredient|component|composition|stock solution)', line, re.I):
-                in_ingredients_section = True
+        # Nothing before the first section header can match, so find it with
+        # one search over the whole text and start on the following line
+        header = _INGREDIENT_SECTION_RE.search(text)
+        if not header:
+            return ingredients
+        section_start = text.find('\n', header.start())
+        if section_start == -1:
+            return ingredients
+
+        for line in text[section_start + 1:].split('\n'):
+            # Skip further section headers
+            if _INGREDIENT_SECTION_RE.search(line):
                 continue
 
-            if in_ingredients_section:
-                # Look for lines with chemical formulas and amounts
-                match = re.search(r'([A-Z][a-z]?[A-Z0-9().·•]+)\s+([\d.]+\s*[a-zA-Z/]+)', line)
-                if match:
-                    ingredient_name = match.group(1)
-                    amount = match.group(2)
-                    ingredients.append({
-                        'agent_term': {'preferred_term': ingredient_name},
-                        'amount': amount
-                    })
-
-                # Stop if we hit a new section
-                if re.search(r'(preparation|method|note|reference)', line, re.I):
+            # Look for lines with chemical formulas and amounts
+            match = _INGREDIENT_RE.search(line)
+            if match:
+                ingredient_name = match.group(1)
+                amount = match.group(2)
+                ingredients.append({
+                    'agent_term': {'preferred_term': ingredient_name},
+                    'amount': amount
+                })
+                if len(ingredients) == _MAX_INGREDIENTS:
                     break
 
-        return ingredients[:20]  # Limit to 20 ingredients
+            # Stop if we hit a new section
+            if _SECTION_END_RE.search(line):
+                break
+
+        return ingredients
 
     def _extract_preparation_from_text(self, text: str) -> List[Dict]:
         """Try to extract preparation steps from PDF text."""
         steps = []
 
-        lines = text.split('\n')
-        in_prep_section = False
+        # Lines before the first preparation header are never used, so find
+        # it with one search and start on the following line
+        header = _PREPARATION_SECTION_RE.search(text)
+        if not header:
+            return steps
+        section_start = text.find('\n', header.start())
+        if section_start == -1:
+            return steps
+
         step_num = 1
 
-        for line in lines:
-            # Look for preparation section
-            if re.search(r'(preparation|method|procedure|protocol)', line, re.I):
-                in_prep_section = True
+        for line in text[section_start + 1:].split('\n'):
+            # Skip further section headers
+            if _PREPARATION_SECTION_RE.search(line):
                 continue
 
-            if in_prep_section and line.strip():
+            instruction = line.strip()
+            if instruction:
                 # Add as a step if it looks like an instruction
-                if len(line.strip()) > 20 and not line.strip().startswith('#'):
+                if len(instruction) > 20 and not instruction.startswith('#'):
                     steps.append({
                         'step_number': step_num,
-                        'instruction': line.strip()
+                        'instruction': instruction
                     })
                     step_num += 1
 
@@ -289,11 +336,29 @@ class SAGImporter:
 
         return steps
 
-    def import_all(self, limit: Optional[int] = None):
+    def _render_recipe(self, recipe: Dict) -> tuple:
+        """Convert a SAG recipe and serialize it to YAML/JSON text.
+
+        Returns:
+            Tuple of (filename stem, serialized text)
+        """
+        cm_recipe, filename = self.convert_recipe(recipe)
+        if self.output_format == 'json':
+            text = dumps_json(cm_recipe, indent=True) + '\n'
+        else:
+            text = dump_recipe_yaml(cm_recipe)
+        return filename, text
+
+    def import_all(self, limit: Optional[int] = None, workers: Optional[int] = 1):
         """Import all SAG recipes.
 
+        Recipes can be converted across a process pool; progress is reported
+        and files are written here in input order. SAG has only a few dozen
+        small recipes, so conversion runs serially unless workers is raised.
+
         Args:
             limit: Optional limit on number of recipes to import
+            workers: Number of worker processes (default: 1 = serial; None = CPU count)
         """
         recipes = self.load_media_data()
         if not recipes:
@@ -304,18 +369,24 @@ class SAGImporter:
             print(f"Limiting import to {limit} recipes")
 
         self.stats['total'] = len(recipes)
+        self._import_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+        results = list(map_in_order(
+            self._render_recipe, recipes, workers=workers, chunksize=8
+        ))
 
-        for idx, recipe in enumerate(recipes, 1):
+        for idx, (recipe, (rendered, error)) in enumerate(zip(recipes, results), 1):
             try:
                 print(f"[{idx}/{len(recipes)}] Importing: {recipe.get('name', 'Unknown')}")
 
-                cm_recipe, filename = self.convert_recipe(recipe)
+                if error:
+                    raise RuntimeError(error)
+                filename, text = rendered
 
-                # Write YAML file
-                output_file = self.algae_dir / f"SAG_{filename}.yaml"
-                with open(output_file, 'w') as f:
-                    yaml.dump(cm_recipe, f, default_flow_style=False, sort_keys=False,
-                              allow_unicode=True)
+                # Write the serialized file in a single call
+                output_file = f"{self._algae_prefix}{filename}.{self.output_format}"
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(text)
 
                 self.stats['success'] += 1
                 self.stats['by_category']['algae'] += 1
@@ -342,6 +413,8 @@ class SAGImporter:
 
 def main():
     """CLI entry point."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Import SAG media recipes into CultureMech"
     )
@@ -362,6 +435,18 @@ def main():
         type=int,
         help="Limit number of media to import (for testing)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (default: 1)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="yaml",
+        help="Output file format (default: yaml)"
+    )
     parser.add_argument(
         "--stats",
         action="store_true",
@@ -377,7 +462,7 @@ def main():
     print(f"Output: {args.output}")
     print()
 
-    importer = SAGImporter(args.input, args.output)
+    importer = SAGImporter(args.input, args.output, output_format=args.format)
 
     if args.stats:
         recipes = importer.load_media_data()
@@ -385,7 +470,7 @@ def main():
         print("\nRun without --stats to import")
         return
 
-    importer.import_all(limit=args.limit)
+    importer.import_all(limit=args.limit, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,16 @@ from .id_utils import (
     find_id_gaps,
     rebuild_culturemech_registry,
 )
+from .filename_utils import sanitize_filename_part
+from .json_utils import (
+    loads_json,
+    load_json_file,
+)
+from .parallel import map_in_order
+from .yaml_utils import (
+    emit_recipe_yaml,
+    dump_recipe_yaml,
+)
 
 __all__ = [
     'parse_xmech_id',
@@ -26,4 +36,10 @@ __all__ = [
     'find_duplicate_ids_multi_file',
     'find_id_gaps',
     'rebuild_culturemech_registry',
+    'sanitize_filename_part',
+    'loads_json',
+    'load_json_file',
+    'map_in_order',
+    'emit_recipe_yaml',
+    'dump_recipe_yaml',
 ]
@@ -0,0 +1,47 @@
+"""Filename sanitizing shared by the importers.
+
+Importers build output filenames from free-text medium names. The shared step
+replaces every run of characters other than alphanumerics, '-' and '.' with a
+single underscore; each importer then applies its own stripping and length
+limit.
+
+Usage:
+    from culturemech.utils.filename_utils import sanitize_filename_part
+
+    clean_name = sanitize_filename_part(name).strip('_')[:50]
+"""
+
+import re
+import string
+
+# Runs of characters that are not alphanumeric, '-' or '.' (underscores
+# included, so existing runs collapse); \w covers str.isalnum() plus '_'
+_SANITIZE_RE = re.compile(r'(?:[^\w.-]|_)+')
+
+# ASCII fast path: map every disallowed character to '_' in one
+# str.translate pass, then collapse runs
+_ALLOWED_ASCII = frozenset(string.ascii_letters + string.digits + '-.')
+_ASCII_SANITIZE_TABLE = str.maketrans({
+    c: '_' for c in map(chr, range(128)) if c not in _ALLOWED_ASCII
+})
+_UNDERSCORE_RUN_RE = re.compile(r'__+')
+
+
+def sanitize_filename_part(name: str) -> str:
+    """Replace runs of unsafe filename characters with a single underscore.
+
+    Unicode letters and digits are kept (matching ``str.isalnum``); leading
+    and trailing underscores are left for the caller to strip.
+
+    Args:
+        name: Free-text name, e.g. a medium name
+
+    Returns:
+        Name containing only alphanumerics, '-', '.' and single underscores
+    """
+    if name.isascii():
+        clean_name = name.translate(_ASCII_SANITIZE_TABLE)
+        if '__' in clean_name:
+            clean_name = _UNDERSCORE_RUN_RE.sub('_', clean_name)
+        return clean_name
+    return _SANITIZE_RE.sub('_', name)
@@ -0,0 +1,79 @@
+"""JSON loading with optional orjson acceleration.
+
+Importers load multi-MB JSON exports at startup. When ``orjson`` is installed
+(``pip install culturemech[fast]``) it is used for parsing; otherwise the
+standard library ``json`` module is used. Both accept raw bytes, so files are
+read without a separate text-decoding step.
+
+Usage:
+    from culturemech.utils.json_utils import dumps_json, load_json_file
+
+    data = load_json_file(Path('data/raw/komodo/komodo_media.json'))
+    print(dumps_json(stats, indent=True))
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document.
+
+    Falls back to the standard library for input orjson rejects but ``json``
+    accepts (e.g. NaN/Infinity literals written by pandas exports).
+
+    Args:
+        data: JSON document as bytes or str
+
+    Returns:
+        Parsed Python object
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def load_json_file(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file.
+
+    Args:
+        path: Path to JSON file
+
+    Returns:
+        Parsed Python object
+    """
+    with open(path, 'rb') as f:
+        return loads_json(f.read())
+
+
+def dumps_json(data: Any, indent: bool = False) -> str:
+    """Serialize an object as JSON text.
+
+    Falls back to the standard library for objects orjson cannot serialize
+    (e.g. non-string dict keys). Compact output and non-ASCII escaping
+    differ between the two backends; the parsed data is the same.
+
+    Args:
+        data: Object to serialize
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        JSON document as str
+    """
+    if HAS_ORJSON:
+        try:
+            option = orjson.OPT_INDENT_2 if indent else 0
+            return orjson.dumps(data, option=option).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(data, indent=2 if indent else None)
@@ -0,0 +1,97 @@
+"""Process-pool helper for importers that convert records independently.
+
+Importers render each medium to YAML in worker processes and write the
+results in the parent, in input order. ``map_in_order`` wraps that pattern:
+the callable (usually a bound importer method) is pickled once per worker via
+the pool initializer rather than once per task, and every result comes back
+as ``(result, error)`` so one bad record does not abort the run.
+
+Usage:
+    from culturemech.utils.parallel import map_in_order
+
+    for medium, (rendered, error) in zip(media, map_in_order(
+        self._render_medium, media, workers=workers, chunksize=32
+    )):
+        ...
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, Sized, Tuple
+
+# Per-process callable used by map_in_order workers (set once by _init_worker)
+_worker_func: Optional[Callable] = None
+_worker_unpack = False
+
+
+def _init_worker(func: Callable, unpack: bool):
+    """Initialize a worker process with the callable to apply."""
+    global _worker_func, _worker_unpack
+    _worker_func = func
+    _worker_unpack = unpack
+
+
+def _call(func: Callable, item: Any, unpack: bool) -> Tuple[Any, Optional[str]]:
+    """Apply func to one item; returns (result, None) or (None, error message)."""
+    try:
+        return (func(*item) if unpack else func(item)), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _call_worker(item: Any) -> Tuple[Any, Optional[str]]:
+    """Apply the worker's callable to one item."""
+    return _call(_worker_func, item, _worker_unpack)
+
+
+def map_in_order(
+    func: Callable,
+    items: Iterable,
+    workers: Optional[int] = None,
+    chunksize: int = 1,
+    max_pending_chunks: Optional[int] = None,
+    unpack: bool = False,
+) -> Iterator[Tuple[Any, Optional[str]]]:
+    """Apply func to items across a process pool, yielding results in order.
+
+    Runs in this process when only one worker is requested or there is at
+    most one item. The pool is shut down when the iterator is exhausted or
+    closed.
+
+    Args:
+        func: Picklable callable, e.g. a bound importer method
+        items: Items to process
+        workers: Number of worker processes (default: CPU count; 1 = serial)
+        chunksize: Items sent to a worker process per task
+        max_pending_chunks: Optional limit on chunks in flight per worker, so
+            a streamed input is not pulled into memory all at once
+        unpack: Call ``func(*item)`` instead of ``func(item)``
+
+    Yields:
+        (result, None) on success, (None, error message) if func raised
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or (isinstance(items, Sized) and len(items) <= 1):
+        for item in items:
+            yield _call(func, item, unpack)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(func, unpack),
+    ) as executor:
+        if max_pending_chunks is None:
+            yield from executor.map(_call_worker, items, chunksize=chunksize)
+            return
+
+        # Executor.map submits its whole input up front
+        window = chunksize * workers * max_pending_chunks
+        items = iter(items)
+        while True:
+            batch = list(islice(items, window))
+            if not batch:
+                return
+            yield from executor.map(_call_worker, batch, chunksize=chunksize)
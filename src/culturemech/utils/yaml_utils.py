@@ -0,0 +1,194 @@
+"""Fast YAML emission for CultureMech recipe dictionaries.
+
+Importers write thousands of recipe files whose contents are plain trees of
+dicts, lists, strings, numbers, booleans and None. For that shape a small
+block-style emitter is much cheaper than PyYAML's representer/emitter
+machinery, while producing YAML that loads back to the same data.
+
+Usage:
+    from culturemech.utils.yaml_utils import dump_recipe_yaml
+
+    text = dump_recipe_yaml(recipe)
+    output_path.write_text(text, encoding='utf-8')
+
+``emit_recipe_yaml`` raises ``TypeError``/``ValueError`` for anything outside
+the supported shape; ``dump_recipe_yaml`` catches that and falls back to
+``yaml.dump`` (libyaml CSafeDumper when available, keeping key order).
+"""
+
+import math
+from typing import Any, List
+
+import yaml
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+
+class _RecipeDumper(SafeDumper):
+    """Safe dumper that keeps dict insertion order without sort_keys checks."""
+
+
+# Passing items() instead of the dict skips represent_mapping's sort branch
+_RecipeDumper.add_representer(
+    dict, lambda dumper, data: dumper.represent_dict(data.items())
+)
+
+# Characters that may not start a plain (unquoted) scalar
+_INDICATORS = frozenset("-?:,[]{}#&*!|>'\"%@`")
+
+_STR_TAG = 'tag:yaml.org,2002:str'
+
+# Resolver used to detect strings that would load back as another type
+# (e.g. 'yes', '1.5', '2024-01-01', 'null')
+_resolver = Resolver()
+
+
+def plain_scalar_is_str(value: str) -> bool:
+    """Return True if a plain (unquoted) scalar would load back as a string.
+
+    Args:
+        value: Scalar text as it would appear unquoted in YAML
+
+    Returns:
+        False for text YAML resolves to another type (e.g. 'yes', '1.5',
+        '2024-01-01', 'null'), True otherwise
+    """
+    return _resolver.resolve(ScalarNode, value, (True, False)) == _STR_TAG
+
+
+def _needs_quotes(value: str) -> bool:
+    """Return True if a string cannot be written as a plain scalar."""
+    if not value or value != value.strip() or not value.isprintable():
+        return True
+    if value[0] in _INDICATORS or value.endswith(':'):
+        return True
+    if ': ' in value or ' #' in value:
+        return True
+    return not plain_scalar_is_str(value)
+
+
+def _escape_char(char: str) -> str:
+    """Escape one non-printable character for a double-quoted scalar."""
+    code = ord(char)
+    if code < 0x100:
+        return f"\\x{code:02X}"
+    if code < 0x10000:
+        return f"\\u{code:04X}"
+    return f"\\U{code:08X}"
+
+
+def _double_quote(value: str) -> str:
+    """Format a string as a YAML double-quoted scalar."""
+    value = value.replace('\\', '\\\\').replace('"', '\\"')
+    if not value.isprintable():
+        value = ''.join(c if c.isprintable() else _escape_char(c) for c in value)
+    return f'"{value}"'
+
+
+def _scalar(value: Any) -> str:
+    """Format a scalar value as YAML."""
+    if isinstance(value, str):
+        return _double_quote(value) if _needs_quotes(value) else value
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Unsupported float value: {value!r}")
+        text = repr(value)
+        # YAML 1.1 floats need a '.' in the mantissa (1e-05 -> 1.0e-05)
+        if '.' not in text and 'e' in text:
+            text = text.replace('e', '.0e', 1)
+        return text
+    if isinstance(value, list) and not value:
+        return '[]'
+    if isinstance(value, dict) and not value:
+        return '{}'
+    raise TypeError(f"Unsupported value type: {type(value).__name__}")
+
+
+def _emit_mapping(mapping: dict, indent: int, out: List[str]) -> None:
+    """Append block-style lines for a non-empty mapping."""
+    pad = ' ' * indent
+    for key, value in mapping.items():
+        if not isinstance(key, str):
+            raise TypeError(f"Unsupported key type: {type(key).__name__}")
+        key_text = _scalar(key)
+        if isinstance(value, dict) and value:
+            out.append(f"{pad}{key_text}:\n")
+            _emit_mapping(value, indent + 2, out)
+        elif isinstance(value, list) and value:
+            # Sequences under a key are not indented (PyYAML's default style)
+            out.append(f"{pad}{key_text}:\n")
+            _emit_sequence(value, indent, out)
+        else:
+            out.append(f"{pad}{key_text}: {_scalar(value)}\n")
+
+
+def _emit_sequence(sequence: list, indent: int, out: List[str]) -> None:
+    """Append block-style lines for a non-empty sequence."""
+    pad = ' ' * indent
+    for item in sequence:
+        if isinstance(item, (dict, list)) and item:
+            nested: List[str] = []
+            if isinstance(item, dict):
+                _emit_mapping(item, indent + 2, nested)
+            else:
+                _emit_sequence(item, indent + 2, nested)
+            # First nested line goes on the dash line
+            nested[0] = f"{pad}- {nested[0][indent + 2:]}"
+            out.extend(nested)
+        else:
+            out.append(f"{pad}- {_scalar(item)}\n")
+
+
+def emit_recipe_yaml(recipe: dict) -> str:
+    """Serialize a recipe dictionary as block-style YAML.
+
+    Key order follows dict insertion order (like ``sort_keys=False``).
+
+    Args:
+        recipe: Recipe dictionary of dicts/lists/str/int/float/bool/None
+
+    Returns:
+        YAML document text
+
+    Raises:
+        TypeError: If the recipe contains unsupported types
+        ValueError: If the recipe contains non-finite floats
+    """
+    if not isinstance(recipe, dict):
+        raise TypeError(f"Recipe must be a dict, got {type(recipe).__name__}")
+    if not recipe:
+        return '{}\n'
+    out: List[str] = []
+    _emit_mapping(recipe, 0, out)
+    return ''.join(out)
+
+
+def dump_recipe_yaml(recipe: dict) -> str:
+    """Serialize a recipe, falling back to PyYAML for unsupported content.
+
+    Args:
+        recipe: Recipe dictionary
+
+    Returns:
+        YAML document text
+    """
+    try:
+        return emit_recipe_yaml(recipe)
+    except (TypeError, ValueError):
+        return yaml.dump(
+            recipe,
+            Dumper=_RecipeDumper,
+            default_flow_style=False,
+            allow_unicode=True,
+        )
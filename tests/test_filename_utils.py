@@ -0,0 +1,16 @@
+"""Unit tests for shared filename sanitizing."""
+
+from culturemech.utils.filename_utils import sanitize_filename_part
+
+
+class TestSanitizeFilenamePart:
+    """Test sanitize_filename_part."""
+
+    def test_ascii_runs_collapse(self):
+        """Test unsafe ASCII characters and existing underscores collapse to one."""
+        assert sanitize_filename_part('VY/2, REDUCED__MEDIUM') == 'VY_2_REDUCED_MEDIUM'
+        assert sanitize_filename_part('_pH 7.0 (a-b)_') == '_pH_7.0_a-b_'
+
+    def test_unicode_letters_kept(self):
+        """Test non-ASCII letters survive while symbols are replaced."""
+        assert sanitize_filename_part('Médium 37°C') == 'Médium_37_C'
@@ -0,0 +1,71 @@
+"""Unit tests for ingredient role enrichment."""
+
+from importlib import import_module
+
+import pytest
+
+roles_module = import_module('culturemech.import.import_ingredient_roles')
+
+ROLES_DB = {'CHEBI:17234': ['CARBON_SOURCE']}
+
+RECIPE = """name: Test Medium
+ingredients:
+- preferred_term: Glucose
+  term:
+    id: CHEBI:17234
+    label: glucose
+"""
+
+
+@pytest.fixture
+def recipe_path(tmp_path):
+    """Recipe with one ingredient listed in ROLES_DB."""
+    path = tmp_path / 'recipe.yaml'
+    path.write_text(RECIPE, encoding='utf-8')
+    return path
+
+
+class TestEnrichRecipe:
+    """Test role enrichment of single recipes."""
+
+    def test_enrich_recipe_with_roles(self, recipe_path, capsys):
+        """Test roles are added and the file is replaced."""
+        assert roles_module.enrich_recipe_with_roles(recipe_path, ROLES_DB)
+
+        assert '  role:\n  - CARBON_SOURCE' in recipe_path.read_text(encoding='utf-8')
+        assert not recipe_path.with_name('recipe.yaml.tmp').exists()
+        assert '✓ Updated recipe.yaml' in capsys.readouterr().out
+
+    def test_dry_run_leaves_file(self, recipe_path, capsys):
+        """Test dry run reports the change without writing."""
+        assert roles_module.enrich_recipe_with_roles(recipe_path, ROLES_DB, dry_run=True)
+
+        assert recipe_path.read_text(encoding='utf-8') == RECIPE
+        assert 'Would update recipe.yaml' in capsys.readouterr().out
+
+    def test_failed_write_not_reported(self, recipe_path, monkeypatch, capsys):
+        """Test a recipe is only reported as updated once its write succeeds."""
+        def fail_write(path, data):
+            raise OSError('disk full')
+
+        monkeypatch.setattr(roles_module, '_atomic_write', fail_write)
+
+        assert roles_module._enrich_files([str(recipe_path)], ROLES_DB) == 0
+
+        out = capsys.readouterr().out
+        assert '✓ Updated' not in out
+        assert 'disk full' in out
+
+
+class TestAtomicWrite:
+    """Test _atomic_write."""
+
+    def test_failed_rename_removes_temp_file(self, tmp_path):
+        """Test the temporary file is removed when the rename fails."""
+        target = tmp_path / 'target.yaml'
+        target.mkdir()
+
+        with pytest.raises(OSError):
+            roles_module._atomic_write(str(target), b'name: x\n')
+
+        assert not (tmp_path / 'target.yaml.tmp').exists()
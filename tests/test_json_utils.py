@@ -0,0 +1,45 @@
+"""Unit tests for JSON loading helpers."""
+
+import json
+import math
+
+from culturemech.utils.json_utils import dumps_json, load_json_file, loads_json
+
+
+class TestLoadsJson:
+    """Test loads_json."""
+
+    def test_bytes_and_str(self):
+        """Test bytes and str input parse identically."""
+        doc = '{"count": 2, "data": [{"id": "1", "name": "Médium"}]}'
+        assert loads_json(doc.encode('utf-8')) == loads_json(doc)
+        assert loads_json(doc)['data'][0]['name'] == 'Médium'
+
+    def test_nan_literals(self):
+        """Test NaN/Infinity literals accepted by the stdlib still load."""
+        data = loads_json(b'{"ph": NaN, "max": Infinity}')
+        assert math.isnan(data['ph'])
+        assert data['max'] == float('inf')
+
+
+class TestLoadJsonFile:
+    """Test load_json_file."""
+
+    def test_load_file(self, tmp_path):
+        """Test reading a UTF-8 JSON file."""
+        path = tmp_path / 'media.json'
+        path.write_text('{"data": [{"name": "Agar ü"}]}', encoding='utf-8')
+        assert load_json_file(path) == {'data': [{'name': 'Agar ü'}]}
+
+
+class TestDumpsJson:
+    """Test dumps_json."""
+
+    def test_indent_matches_stdlib(self):
+        """Test indented output matches json.dumps(indent=2) for plain data."""
+        stats = {'total_media': 3, 'by_category': {'bacterial': 2, 'fungal': 1}}
+        assert dumps_json(stats, indent=True) == json.dumps(stats, indent=2)
+
+    def test_non_str_keys(self):
+        """Test dicts with non-string keys still serialize."""
+        assert loads_json(dumps_json({1: 'a'})) == {'1': 'a'}
@@ -0,0 +1,79 @@
+"""Unit tests for the MediaDB importer."""
+
+import json
+from importlib import import_module
+
+import pytest
+
+mediadb_importer = import_module('culturemech.import.mediadb_importer')
+MediaDBImporter = mediadb_importer.MediaDBImporter
+_read_recipe_name = mediadb_importer._read_recipe_name
+
+
+class _StubMapper:
+    """Chemical mapper returning no ChEBI matches."""
+
+    def lookup_many(self, names):
+        return {name: None for name in names}
+
+
+def _write_mediadb(data_dir, media):
+    """Write a minimal MediaDB export with one compound."""
+    data_dir.mkdir()
+    (data_dir / 'mediadb_media.json').write_text(json.dumps({'data': media}))
+    (data_dir / 'mediadb_compounds.json').write_text(
+        json.dumps({'data': [{'id': 'C1', 'name': 'C00031', 'chebi_id': 'glucose'}]})
+    )
+    (data_dir / 'mediadb_organisms.json').write_text(json.dumps({'data': []}))
+
+
+class TestImportAll:
+    """Test that one malformed medium does not abort the import."""
+
+    @pytest.mark.parametrize('bad_medium', [
+        {'id': '1', 'name': None},
+        {'id': '1', 'name': 'Broken Medium', 'composition': None},
+    ])
+    def test_bad_medium_is_skipped(self, tmp_path, bad_medium):
+        """Test a medium with a null name or composition is logged and skipped."""
+        _write_mediadb(tmp_path / 'in', [
+            bad_medium,
+            {'id': '2', 'name': 'Good Medium',
+             'composition': [{'compound_id': 'C1', 'concentration': 1, 'unit': 'g/L'}]},
+        ])
+        importer = MediaDBImporter(
+            tmp_path / 'in', tmp_path / 'out', chemical_mapper=_StubMapper()
+        )
+
+        generated = importer.import_all(workers=1)
+
+        assert [path.name for path in generated] == ['MEDIADB_2_Good_Medium.yaml']
+        assert (tmp_path / 'out' / 'bacterial' / 'MEDIADB_2_Good_Medium.yaml').exists()
+
+
+class TestReadRecipeName:
+    """Test _read_recipe_name head scan and full-parse fallback."""
+
+    @pytest.mark.parametrize('text, expected', [
+        ('name: LB Medium\ncategory: bacterial\n', 'LB Medium'),
+        ('name: "LB: Miller"\n', 'LB: Miller'),
+        ("name: 'Agar #2'\n", 'Agar #2'),
+        ('name: !!str 1.5\n', '1.5'),
+        ('name: 1.5\n', 1.5),
+        ('name: Long medium\n  name continued\ncategory: x\n', 'Long medium name continued'),
+        ('name: >\n  Folded\n  name\n', 'Folded name\n'),
+        ('category: x\n', None),
+    ])
+    def test_name_values(self, tmp_path, text, expected):
+        """Test quoted, tagged, non-string and multi-line names load as YAML would."""
+        path = tmp_path / 'recipe.yaml'
+        path.write_text(text, encoding='utf-8')
+        assert _read_recipe_name(path) == expected
+
+    def test_name_after_head(self, tmp_path):
+        """Test a name beyond the scanned head is found by the full parse."""
+        path = tmp_path / 'recipe.yaml'
+        path.write_text(
+            'description: ' + 'x' * 5000 + '\nname: Late Medium\n', encoding='utf-8'
+        )
+        assert _read_recipe_name(path) == 'Late Medium'
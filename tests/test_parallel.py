@@ -0,0 +1,25 @@
+"""Unit tests for the importer process-pool helper."""
+
+import pytest
+
+from culturemech.utils.parallel import map_in_order
+
+
+class TestMapInOrder:
+    """Test map_in_order."""
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_results_in_order_with_errors(self, workers):
+        """Test results keep input order and errors are returned, not raised."""
+        results = list(map_in_order(int, ['1', 'x', '3'], workers=workers))
+        assert [r for r, _ in results] == [1, None, 3]
+        assert results[0][1] is None
+        assert 'invalid literal' in results[1][1]
+
+    def test_unpack_and_window(self):
+        """Test tuple items are unpacked and a bounded window covers all items."""
+        items = iter([(n, 3) for n in range(20)])
+        results = list(map_in_order(
+            divmod, items, workers=2, chunksize=2, max_pending_chunks=1, unpack=True
+        ))
+        assert results == [(divmod(n, 3), None) for n in range(20)]
@@ -0,0 +1,114 @@
+"""Unit tests for the fast recipe YAML emitter."""
+
+import pytest
+import yaml
+
+from culturemech.utils.yaml_utils import dump_recipe_yaml, emit_recipe_yaml
+
+
+class TestEmitRecipeYaml:
+    """Test emit_recipe_yaml round-trips."""
+
+    def test_round_trip_recipe(self):
+        """Test a typical importer recipe loads back unchanged."""
+        recipe = {
+            'name': 'LB Medium (Miller)',
+            'original_name': 'LB Medium (Miller)',
+            'category': 'imported',
+            'medium_type': 'COMPLEX',
+            'physical_state': 'LIQUID',
+            'ingredients': [
+                {
+                    'preferred_term': 'Glucose',
+                    'term': {'id': 'CHEBI:17234', 'label': 'glucose'},
+                    'concentration': {'value': '10', 'unit': 'G_PER_L'},
+                    'notes': 'SEED ID: cpd00027',
+                },
+                {
+                    'preferred_term': 'See source for composition',
+                    'concentration': {'value': 'variable', 'unit': 'G_PER_L'},
+                },
+            ],
+            'preparation_steps': [
+                {'step_number': 1, 'action': 'AUTOCLAVE',
+                 'description': 'Sterilize by autoclaving at 121°C for 15-20 minutes'},
+            ],
+            'curation_history': [
+                {'timestamp': '2024-01-01T00:00:00.000000Z', 'curator': 'test',
+                 'action': 'Imported', 'notes': 'Source: KOMODO, ID: 1'},
+            ],
+            'applications': ['Microbial cultivation'],
+        }
+
+        text = emit_recipe_yaml(recipe)
+
+        assert yaml.safe_load(text) == recipe
+        assert list(yaml.safe_load(text)) == list(recipe)
+
+    @pytest.mark.parametrize('value', [
+        '', ' leading', 'trailing ', 'yes', 'No', 'null', '~', '1.5', '10', '1e5',
+        '0x1F', '1:30', '2024-01-01', '- dash', 'key: value', 'a #comment',
+        'ends with:', '"quoted"', "'single'", '*alias', '&anchor', '!tag', '%pct',
+        '@at', '`tick', '[list]', '{map}', '?q', '|pipe', '>fold', '#hash',
+        'multi\nline', 'tab\there', 'ctrl\x07', 'sep x', 'nbsp x',
+        'Ñaß µM', '.inf', '<<', '=', 'CHEBI:12345', 'http://example.org/a#b',
+    ])
+    def test_round_trip_strings(self, value):
+        """Test strings needing quotes or escapes survive a round trip."""
+        recipe = {'value': value, 'items': [value, {'nested': value}]}
+        assert yaml.safe_load(emit_recipe_yaml(recipe)) == recipe
+
+    @pytest.mark.parametrize('value', [
+        0, -3, 1.5, 1e-05, 1e16, -2.5e-10, True, False, None, [], {},
+    ])
+    def test_round_trip_scalars(self, value):
+        """Test non-string scalars keep their type."""
+        recipe = {'value': value}
+        loaded = yaml.safe_load(emit_recipe_yaml(recipe))
+        assert loaded == recipe
+        assert type(loaded['value']) is type(value)
+
+    def test_nested_sequences(self):
+        """Test sequences of sequences and mappings with list values."""
+        recipe = {
+            'matrix': [[1, 2], [3, [4, 5]]],
+            'solutions': [{'id': 'S1', 'composition': [{'name': 'NaCl'}, {'name': 'KCl'}]}],
+        }
+        assert yaml.safe_load(emit_recipe_yaml(recipe)) == recipe
+
+    def test_block_layout_matches_pyyaml(self):
+        """Test plain recipes use PyYAML's default block layout."""
+        recipe = {
+            'name': 'Test Medium',
+            'ingredients': [{'preferred_term': 'NaCl', 'term': {'id': 'CHEBI:26710'}}],
+            'applications': ['Microbial cultivation'],
+        }
+        expected = yaml.dump(recipe, default_flow_style=False, sort_keys=False)
+        assert emit_recipe_yaml(recipe) == expected
+
+    def test_unsupported_types_raise(self):
+        """Test unsupported values are rejected."""
+        with pytest.raises(TypeError):
+            emit_recipe_yaml({'value': object()})
+        with pytest.raises(TypeError):
+            emit_recipe_yaml({1: 'int key'})
+        with pytest.raises(ValueError):
+            emit_recipe_yaml({'value': float('nan')})
+
+
+class TestDumpRecipeYaml:
+    """Test dump_recipe_yaml fallback."""
+
+    def test_falls_back_for_unsupported_values(self):
+        """Test fallback to PyYAML for values the emitter rejects."""
+        recipe = {'value': float('inf'), 'name': 'x'}
+        loaded = yaml.safe_load(dump_recipe_yaml(recipe))
+        assert loaded['value'] == float('inf')
+        assert loaded['name'] == 'x'
+
+    def test_fallback_keeps_key_order(self):
+        """Test the PyYAML fallback preserves insertion order."""
+        recipe = {'zeta': float('inf'), 'alpha': {'beta': 1, 'aa': 2}}
+        text = dump_recipe_yaml(recipe)
+        assert text.index('zeta') < text.index('alpha') < text.index('beta') < text.index('aa')
+        assert yaml.safe_load(text) == recipe